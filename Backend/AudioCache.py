@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.path.join("Data", "TTSCache")
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+def audio_cache_key(voice, fmt, text):
+    """Content address for a rendered phrase: the same voice, format and text always map to the same file"""
+    text = " ".join(text.split())
+    return hashlib.sha256(f"{voice}\n{fmt}\n{text}".encode("utf-8")).hexdigest()
+
+class AudioCache:
+    """Size-bounded LRU of synthesized audio, one file per phrase plus a JSON index"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> [filename, size], least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # One index writer at a time (synth worker and prewarm thread both save)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = []
+        for key, filename, size in index:
+            if os.path.exists(os.path.join(self.directory, filename)):
+                self.entries[key] = [filename, size]
+                self.total_bytes += size
+
+    def save(self):
+        """Write the index atomically (entries are kept in LRU order); a failed write is retried on the next save"""
+        with self.save_lock:
+            with self.lock:
+                index = [[key, filename, size] for key, (filename, size) in self.entries.items()]
+                self.dirty = False
+            tmp_path = self.index_path + ".tmp"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(tmp_path, "w") as f:
+                    json.dump(index, f)
+                os.replace(tmp_path, self.index_path)
+            except OSError as e:
+                self.dirty = True
+                print(f"[AudioCache] Could not save the index: {e}")
+
+    def get(self, key):
+        """Return the cached audio bytes for key, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            path = os.path.join(self.directory, entry[0])
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            with self.lock:
+                if self.entries.pop(key, None):
+                    self.total_bytes -= entry[1]
+                self.misses += 1
+            return None
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.dirty = True
+            self.hits += 1
+        return audio
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def put(self, key, audio, fmt):
+        """Store audio for key; a disk error only skips caching, it never fails the caller"""
+        if not audio or len(audio) > self.max_bytes:
+            return
+        filename = f"{key}.{fmt}"
+        # Unique temp name: two threads may render the same phrase at once
+        tmp_path = os.path.join(self.directory, f"{filename}.{threading.get_ident()}.tmp")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, os.path.join(self.directory, filename))
+        except OSError as e:
+            print(f"[AudioCache] Could not cache audio: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        evicted = []
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= old[1]
+            self.entries[key] = [filename, len(audio)]
+            self.total_bytes += len(audio)
+            while self.total_bytes > self.max_bytes:
+                _, (old_file, size) = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                evicted.append(old_file)
+        for old_file in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old_file))
+            except OSError:
+                pass
+        self.save()
+
+    def flush(self):
+        """Persist recency changes from cache hits"""
+        if self.dirty:
+            self.save()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+class CachedSynthesizer:
+    """Wraps a synthesizer so phrases it has rendered before come from the cache with no network round trip"""
+
+    def __init__(self, synthesizer, cache):
+        self.synthesizer = synthesizer
+        self.cache = cache
+        self.format = synthesizer.format
+
+    def key(self, text):
+        voice = getattr(self.synthesizer, "voice", type(self.synthesizer).__name__)
+        return audio_cache_key(voice, self.format, text)
+
+    def is_cached(self, text):
+        return self.key(text) in self.cache
+
+    async def synthesize(self, text):
+        key = self.key(text)
+        audio = self.cache.get(key)
+        if audio is not None:
+            return audio
+        audio = await self.synthesizer.synthesize(text)
+        self.cache.put(key, audio, self.format)
+        return audio
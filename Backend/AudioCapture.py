@@ -0,0 +1,267 @@
+import sys
+import time
+import threading
+import numpy as np
+from dotenv import dotenv_values
+
+try:
+    import pyaudio
+    HAVE_PYAUDIO = True
+except ImportError:
+    HAVE_PYAUDIO = False
+
+env_vars = dotenv_values(".env")
+CAPTURE_RATE = int(env_vars.get("CaptureRate", "16000"))  # Device rate; subscribers at this rate need no resampling
+CAPTURE_BLOCK_MS = 10
+RING_SECONDS = 10
+
+class SPSCRing:
+    """Single-producer/single-consumer sample ring without locks
+
+    Every sample is stored twice, `capacity` apart, so any window of up to `capacity` samples is one contiguous
+    slice and can be handed out as a view. Only the producer advances `written` and only the consumer advances
+    `consumed`. A view stays valid until the producer has written `capacity` more samples."""
+
+    def __init__(self, capacity, dtype):
+        self.buffer = np.zeros(2 * capacity, dtype=dtype)
+        self.capacity = capacity
+        self.written = 0
+        self.consumed = 0
+        self.overruns = 0
+        self.data_ready = threading.Event()
+
+    def write(self, samples):
+        count = len(samples)
+        if count > self.capacity:
+            self.written += count - self.capacity
+            samples = samples[-self.capacity:]
+            count = self.capacity
+        start = self.written % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[start + self.capacity:start + self.capacity + first] = samples[:first]
+        rest = count - first
+        if rest:
+            self.buffer[:rest] = samples[first:]
+            self.buffer[self.capacity:self.capacity + rest] = samples[first:]
+        self.written += count
+        self.data_ready.set()
+
+    def available(self):
+        return self.written - self.consumed
+
+    def read(self, count, timeout=None):
+        """Return a view of the next `count` samples, or None if they did not arrive within `timeout` seconds"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.written - self.consumed < count:
+            self.data_ready.clear()
+            if self.written - self.consumed >= count:
+                break
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return None
+            if not self.data_ready.wait(remaining):
+                return None
+        if self.written - self.consumed > self.capacity:
+            # The consumer fell a whole ring behind: skip to the oldest audio still stored
+            self.consumed = self.written - self.capacity
+            self.overruns += 1
+        start = self.consumed % self.capacity
+        self.consumed += count
+        return self.buffer[start:start + count]
+
+    def clear(self):
+        self.consumed = self.written
+
+class StreamResampler:
+    """Linear-interpolation resampler that keeps its phase across blocks"""
+
+    def __init__(self, source_rate, target_rate):
+        self.step = source_rate / target_rate
+        self.position = 0.0  # Next output position; 0 is the first sample of the next block, -1 the last one seen
+        self.last = 0.0
+
+    def process(self, block):
+        if self.step == 1.0:
+            return block
+        count = len(block)
+        if self.position > count - 1:
+            self.position -= count
+            self.last = block[-1]
+            return block[:0]
+        outputs = int((count - 1 - self.position) // self.step) + 1
+        positions = self.position + 1 + np.arange(outputs) * self.step
+        samples = np.interp(positions, np.arange(count + 1), np.concatenate(([self.last], block))).astype(np.float32)
+        self.position += outputs * self.step - count
+        self.last = block[-1]
+        return samples
+
+class Subscription:
+    """One consumer's view of the microphone at its own rate, frame size and sample type"""
+
+    def __init__(self, bus, name, rate, frame_samples, dtype, seconds=RING_SECONDS):
+        self.bus = bus
+        self.name = name
+        self.rate = rate
+        self.frame_samples = frame_samples
+        self.dtype = np.dtype(dtype)
+        self.ring = SPSCRing(rate * seconds, self.dtype)
+
+    def read_frame(self, timeout=None):
+        """Next frame as a zero-copy view (int16 or float32 in [-1, 1]), or None on timeout"""
+        return self.ring.read(self.frame_samples, timeout)
+
+    def clear(self):
+        """Drop audio captured before now, e.g. at the start of a new utterance"""
+        self.ring.clear()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class AudioCaptureBus:
+    """Owns the microphone and fans each captured block out to every subscriber
+
+    Blocks are converted to float once and resampled once per distinct subscriber rate; int16 subscribers at
+    the capture rate get the device samples as they are."""
+
+    def __init__(self, rate=CAPTURE_RATE, block_ms=CAPTURE_BLOCK_MS):
+        self.rate = rate
+        self.block_samples = rate * block_ms // 1000
+        self.subscribers = ()
+        self.groups = ()  # (rate, resampler, subscribers), rebuilt on (un)subscribe and swapped in atomically
+        self.lock = threading.Lock()
+        self.audio = None
+        self.stream = None
+        self.processor = None  # block -> block, applied before fan-out (echo cancellation)
+        self.blocks = 0
+        self.push_seconds = 0.0
+
+    def subscribe(self, name, rate=None, frame_samples=None, dtype=np.int16, seconds=RING_SECONDS):
+        rate = rate or self.rate
+        subscription = Subscription(self, name, rate, frame_samples or rate * 30 // 1000, dtype, seconds)
+        with self.lock:
+            self.subscribers = self.subscribers + (subscription,)
+            self._rebuild_groups()
+        print(f"[AudioCapture] {name} subscribed at {rate} Hz, {subscription.frame_samples}-sample frames")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers = tuple(s for s in self.subscribers if s is not subscription)
+            self._rebuild_groups()
+
+    def set_processor(self, processor):
+        """Install a function that cleans each int16 block before subscribers see it, or None to remove it"""
+        self.processor = processor
+
+    def _rebuild_groups(self):
+        previous = {rate: resampler for rate, resampler, _ in self.groups}
+        rates = sorted({s.rate for s in self.subscribers})
+        self.groups = tuple((rate, previous.get(rate) or StreamResampler(self.rate, rate),
+                             tuple(s for s in self.subscribers if s.rate == rate)) for rate in rates)
+
+    def push(self, block):
+        """Fan one int16 block out to the subscribers (called from the capture callback, or directly in tests)"""
+        started = time.perf_counter()
+        processor = self.processor
+        if processor is not None:
+            block = processor(block)
+        normalized = None
+        for rate, resampler, subscribers in self.groups:
+            if rate == self.rate and all(s.dtype == np.int16 for s in subscribers):
+                for subscription in subscribers:
+                    subscription.ring.write(block)
+                continue
+            if normalized is None:
+                normalized = block.astype(np.float32)
+                normalized *= 1.0 / 32768
+            samples = resampler.process(normalized)
+            as_int16 = None
+            for subscription in subscribers:
+                if subscription.dtype == np.int16:
+                    if as_int16 is None:
+                        as_int16 = block if rate == self.rate else (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+                    subscription.ring.write(as_int16)
+                else:
+                    subscription.ring.write(samples)
+        self.blocks += 1
+        self.push_seconds += time.perf_counter() - started
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self.push(np.frombuffer(in_data, dtype=np.int16))
+        return (None, pyaudio.paContinue)
+
+    def start(self):
+        """Open the microphone if it is not open yet"""
+        with self.lock:
+            if self.stream:
+                return
+            if not HAVE_PYAUDIO:
+                raise RuntimeError("PyAudio is not installed")
+            self.audio = pyaudio.PyAudio()
+            try:
+                self.stream = self.audio.open(format=pyaudio.paInt16, channels=1, rate=self.rate, input=True,
+                                              frames_per_buffer=self.block_samples, stream_callback=self._callback)
+            except Exception:
+                self.audio.terminate()
+                self.audio = None
+                raise
+        print(f"[AudioCapture] Microphone open at {self.rate} Hz")
+
+    def is_running(self):
+        return self.stream is not None
+
+    def stop(self):
+        with self.lock:
+            if self.stream:
+                self.stream.stop_stream()
+                self.stream.close()
+                self.stream = None
+            if self.audio:
+                self.audio.terminate()
+                self.audio = None
+        print(f"[AudioCapture] Microphone closed: {self.stats()}")
+
+    def stats(self):
+        return {
+            "blocks": self.blocks,
+            "avg_push_us": self.push_seconds / self.blocks * 1e6 if self.blocks else 0.0,
+            "overruns": {s.name: s.ring.overruns for s in self.subscribers},
+        }
+
+# Global instance for easy access
+capture_bus = AudioCaptureBus()
+
+def benchmark_fanout(seconds=10.0):
+    """Push synthetic capture blocks through a volume (16 kHz float), speech (16 kHz int16) and 48 kHz subscriber"""
+    bus = AudioCaptureBus()
+    volume = bus.subscribe("volume", 16000, 512, np.float32)
+    speech = bus.subscribe("speech", 16000, 480, np.int16)
+    recorder = bus.subscribe("recorder", 48000, 1440, np.float32)
+    t = np.arange(bus.block_samples)
+    blocks = int(seconds * 1000 / CAPTURE_BLOCK_MS)
+    frames = 0
+    for i in range(blocks):
+        bus.push((8000 * np.sin(2 * np.pi * 440 * (t + i * bus.block_samples) / bus.rate)).astype(np.int16))
+        for subscription in (volume, speech, recorder):
+            while subscription.ring.available() >= subscription.frame_samples:
+                subscription.read_frame(0)
+                frames += 1
+    stats = bus.stats()
+    print(f"[AudioCapture] {blocks} blocks of {CAPTURE_BLOCK_MS} ms fanned out to 3 subscribers, "
+          f"{frames} frames read, {stats['avg_push_us']:.1f} us per block, overruns {stats['overruns']}")
+    return stats
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_fanout()
+    else:
+        meter = capture_bus.subscribe("meter", 16000, 1600, np.float32)
+        capture_bus.start()
+        try:
+            while True:
+                frame = meter.read_frame(timeout=1)
+                if frame is not None:
+                    print(f"Level: {float(np.sqrt(np.mean(frame * frame))):.3f}")
+        except KeyboardInterrupt:
+            capture_bus.stop()
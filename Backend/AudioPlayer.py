@@ -0,0 +1,135 @@
+import io
+import time
+import threading
+import numpy as np
+import pygame
+
+ENVELOPE_MS = 10  # Resolution of the far-end level track used by barge-in
+
+class AudioPlayer:
+    """Plays encoded audio (mp3/wav bytes) from memory on a mixer that stays open for the app's lifetime
+
+    Clips are decoded to a Sound so the player knows their length and PCM: waiting on a clip is an Event wait
+    that stop() wakes at once, the PCM's level envelope tells listeners how loud the speaker is right now, and
+    the PCM itself is the echo canceller's far-end reference."""
+
+    def __init__(self, frequency=24000, channels=1, buffer=1024):
+        self.frequency = frequency  # edge-tts produces 24 kHz mono
+        self.channels = channels
+        self.buffer = buffer
+        self.lock = threading.Lock()
+        self.channel = None
+        self.sound = None
+        self.pcm = None
+        self.envelope_db = None
+        self.started = None
+        self.done = threading.Event()
+        self.done.set()
+        self.stopped = False
+        self.volume = 1.0
+        self.references = {}  # rate -> clip PCM resampled for the echo canceller
+        self.reference_cursor = 0
+
+    def _ensure_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=self.frequency, size=-16, channels=self.channels, buffer=self.buffer)
+            print("[AudioPlayer] Audio device opened")
+
+    def start(self, audio, fmt="mp3"):
+        """Begin playing an in-memory clip and return immediately"""
+        with self.lock:
+            self._ensure_mixer()
+            if self.channel:
+                self.channel.stop()
+            self.sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+            pcm = pygame.sndarray.array(self.sound)
+            self.pcm = pcm.mean(axis=1).astype(np.int16) if pcm.ndim > 1 else pcm
+            rate = pygame.mixer.get_init()[0]
+            step = rate * ENVELOPE_MS // 1000
+            blocks = self.pcm[:len(self.pcm) // step * step].reshape(-1, step).astype(np.float32) / 32768
+            self.envelope_db = 10 * np.log10((blocks * blocks).mean(axis=1) + 1e-12)
+            self.references = {}
+            self.reference_cursor = 0
+            self.stopped = False
+            self.done.clear()
+            self.channel = self.sound.play()
+            if self.channel is None:
+                self.done.set()
+                raise RuntimeError("no free mixer channel")
+            self.channel.set_volume(self.volume)
+            self.started = time.perf_counter()
+
+    def is_busy(self):
+        return self.channel is not None and not self.done.is_set() and self.channel.get_busy()
+
+    def wait(self):
+        """Block until the clip ends or stop() is called; return False if it was stopped"""
+        if self.sound is None:
+            return True
+        remaining = self.started + self.sound.get_length() - time.perf_counter()
+        if self.done.wait(max(remaining, 0)):
+            return not self.stopped
+        # The device may lag the clock by a buffer or so
+        while self.channel.get_busy() and not self.done.wait(0.005):
+            pass
+        self.done.set()
+        return not self.stopped
+
+    def play(self, audio, fmt="mp3"):
+        """Play a clip to the end; return False if stop() interrupted it"""
+        self.start(audio, fmt)
+        return self.wait()
+
+    def far_end_level(self, lookback_ms=150):
+        """Loudest playback level (dBFS) over the last `lookback_ms`, covering the speaker-to-mic delay, or None"""
+        if not self.is_busy():
+            return None
+        position = int((time.perf_counter() - self.started) * 1000 / ENVELOPE_MS)
+        window = self.envelope_db[max(position - lookback_ms // ENVELOPE_MS, 0):position + 1]
+        return float(window.max()) + 20 * np.log10(max(self.volume, 1e-3)) if len(window) else None
+
+    def read_reference(self, count, rate):
+        """Next `count` samples at `rate` of what the speaker plays (float, volume applied), zeros when idle
+
+        Called once per captured mic block, so the cursor follows playback at the capture clock; the constant
+        output latency shows up as a delay the echo canceller's filter absorbs."""
+        if not self.is_busy():
+            return np.zeros(count)
+        reference = self.references.get(rate)
+        if reference is None:
+            source_rate = pygame.mixer.get_init()[0]
+            positions = np.arange(int(len(self.pcm) * rate / source_rate)) * source_rate / rate
+            reference = np.interp(positions, np.arange(len(self.pcm)), self.pcm / 32768.0)
+            self.references = {rate: reference}
+        start = self.reference_cursor
+        self.reference_cursor += count
+        chunk = reference[start:start + count] * self.volume
+        return chunk if len(chunk) == count else np.pad(chunk, (0, count - len(chunk)))
+
+    def set_volume(self, volume):
+        """Duck (volume < 1) or restore the current and following clips"""
+        self.volume = volume
+        channel = self.channel
+        if channel is not None:
+            channel.set_volume(volume)
+
+    def stop(self):
+        """Stop playback immediately and wake whoever waits on the clip; safe to call from any thread"""
+        self.stopped = True
+        self.done.set()
+        try:
+            if self.channel is not None:
+                self.channel.stop()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        """Close the audio device when the application exits"""
+        with self.lock:
+            self.stop()
+            if pygame.mixer.get_init():
+                pygame.mixer.quit()
+                print("[AudioPlayer] Audio device closed")
+
+# Global instance for easy access
+audio_player = AudioPlayer()
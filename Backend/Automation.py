@@ -13,17 +13,26 @@ import asyncio
 import os
 import json
 import websockets
-from chrome_tab_closer import tab_closer_server
+from Backend.Resilience import call_with_retry
+from Backend.EventLoop import backend_loop
 
 env_vars = dotenv_values(".env")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 classes = ["zCubwf","hgKElc","LTKOO sY7ric","Z0LcW","gsrt vk_bk FzvWSb YwPhnf","pclqee","tw-Data-text tw-text-small tw-ta","IZ6rdc","O5uR6d LTKOO","vlzY6d","webanswers-webanswers_table__webanswers-table","dDoNo ikb4Bb gsrt","sXLaOe","LWkfKe","VQF4g","qv3Wpe","kno-rdesc","SPZz6b"]
 useragent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36'
-client = Groq(api_key=GroqAPIKey)
+client = None
+_tab_closer = None
 professional_responses = ["Your satisfaction is my top priority; feel free to reach out if there's anything else I can help you with.","I'm at your service for any additional questions or support you may need—don't hesitate to ask.","Continued support is my commitment to you. Let me know if there's anything more I can do for you.","I'm here to ensure your experience is seamless. If you have any further requests, please let me know.","Your needs are important to me. If there's anything I can assist you with, I'm just a message away.","I'm dedicated to providing excellent service. Should you require further assistance, I'm here for you.","Exceeding your expectations is my goal. Don't hesitate to reach out for any additional help you may need.","Your satisfaction matters. If you have more questions or need assistance, feel free to ask.","I'm committed to making your experience positive. Let me know if there's anything else I can do for you.","Your feedback is valued. If there's anything I can do to enhance your experience, please let me know.","If there's anything specific you'd like assistance with, please share, and I'll be happy to help.","Your concerns are important to me. Feel free to ask for further guidance or information.","I'm here to address any additional queries or provide clarification as needed.","For a seamless experience, let me know if there's anything else you require assistance with.","Your satisfaction is key; if there's a specific area you'd like more support in, I'm here for you.","Don't hesitate to let me know if there's a particular aspect you'd like further clarification on.","I aim to make your interaction effortless. If there's more you need, feel free to inform me.","Your input is valuable. Please share any additional requirements, and I'll respond promptly.","Should you require more details or have additional questions, I'm ready to provide assistance.","Your success is important to me. If there's anything else you need support with, feel free to ask."]
 messages = []
 SystemChatBot = [{"role": "system","content": f"Hello, I am {os.environ['Username']}, You're a content writer. You have to write content like letters, codes, applications, essays, notes, songs, poems etc."}]
 
+def get_client():
+      """Create the Groq client on first use instead of at import"""
+      global client
+      if client is None:
+            client = Groq(api_key=GroqAPIKey)
+      return client
+
 def GoogleSearch(Topic):
       search(Topic)
       return True
@@ -36,31 +45,35 @@ def Content(Topic):
 
       def ContentWriterAI(prompt):
       
+            def OpenStream():
+                  return get_client().chat.completions.create(
+                  model = "mixtral-8x7b-32768",
+                  messages = SystemChatBot + messages,
+                  max_tokens=2048,
+                  temperature=0.7,
+                  top_p=1,
+                  stream=True,
+                  stop=None)
+
             messages.append({"role": "user", "content": f"{prompt}"})
-            completion = client.chat.completions.create(
-            model = "mixtral-8x7b-32768",
-            messages = SystemChatBot + messages,
-            max_tokens=2048,
-            temperature=0.7,
-            top_p=1,
-            stream=True,
-            stop=None)
+            completion = call_with_retry("groq", OpenStream)
 
             Answer =""
             for chunk in completion:
-                  if chunk.choices[0].delta.content:
-                        Answer += chunk.choices[0].delta.content
+                  delta = chunk.choices[0].delta.content
+                  if delta:
+                        Answer += delta
+                        yield delta.replace("</s>", "")
 
-            Answer = Answer.replace("</s>", "")
-            messages.append({"role": "assistant", "content": Answer})
-            return Answer
+            messages.append({"role": "assistant", "content": Answer.replace("</s>", "")})
 
       topic_str: str = Topic.replace("Content ", "")
-      ContentByAI = ContentWriterAI(topic_str)
 
+      # Write the content to disk as it is generated
       with open(rf"Data\{topic_str.lower().replace(' ','')}.txt","w",encoding="utf-8") as file:
-            file.write(ContentByAI)
-            file.close()
+            for delta in ContentWriterAI(topic_str):
+                  file.write(delta)
+                  file.flush()
 
       OpenNotepad(rf"Data\{topic_str.lower().replace(' ','')}.txt")
       return True
@@ -109,21 +122,54 @@ def OpenApp(app, sess=requests.session()):
 
             return True
 
+def ensure_tab_closer():
+    """Import the chrome_tab_closer helper on first use instead of at startup"""
+    global _tab_closer
+    if _tab_closer is None:
+        try:
+            from chrome_tab_closer import tab_closer_server
+            _tab_closer = tab_closer_server
+        except ImportError as e:
+            print(f"[Automation] Chrome tab closer unavailable: {e}")
+    return _tab_closer
+
+class TabCloserClient:
+    """Keeps one WebSocket to the Chrome extension's tab-closer server open across commands, on the backend loop"""
+
+    def __init__(self, url="ws://localhost:8765"):
+        self.url = url
+        self.websocket = None
+        self.lock = None
+
+    async def send(self, command):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+            backend_loop.register_cleanup(self.close)
+        async with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.websocket is None:
+                        self.websocket = await websockets.connect(self.url)
+                    await self.websocket.send(json.dumps(command))
+                    return True
+                except Exception as e:
+                    # A server restart leaves a dead socket behind: reconnect once
+                    self.websocket = None
+                    if attempt:
+                        print(f"[Automation] ❌ Could not send close tab command: {e}")
+            return False
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+            self.websocket = None
+
+_tab_client = TabCloserClient()
+
 def close_chrome_tab_by_url(url_fragment):
     """Send a WebSocket command to the Chrome extension to close a tab by URL fragment."""
-    async def send_command():
-        try:
-            async with websockets.connect("ws://localhost:8765") as websocket:
-                command = {"action": "close_tab", "url": url_fragment}
-                await websocket.send(json.dumps(command))
-        except Exception as e:
-            print(f"[Automation] ❌ Could not send close tab command: {e}")
-    # Run the async function in the event loop
-    try:
-        asyncio.get_event_loop().run_until_complete(send_command())
-    except RuntimeError:
-        # If already in an event loop (e.g., in Jupyter), use create_task
-        asyncio.create_task(send_command())
+    ensure_tab_closer()
+    return backend_loop.run(_tab_client.send({"action": "close_tab", "url": url_fragment}), timeout=10)
 
 def CloseApp(app):
     app = app.strip().lower()
@@ -0,0 +1,162 @@
+import sys
+import time
+import threading
+import numpy as np
+
+FRAME_MS = 10
+SAMPLE_RATE = 16000
+
+class BargeInDetector:
+    """Decides from 10 ms mic frames whether the user is talking over the assistant
+
+    The mic also hears the assistant, so a frame only counts as the user when it is louder than both the room
+    noise floor and the expected echo: the far-end playback level plus a speaker-to-mic coupling that is learned
+    while the assistant talks alone. The first loud frame ducks playback, `confirm_frames` in a row stop it."""
+
+    def __init__(self, snr_db=10.0, echo_margin_db=9.0, initial_coupling_db=-10.0, confirm_frames=3, min_energy_db=-55.0):
+        self.snr_db = snr_db
+        self.echo_margin_db = echo_margin_db
+        self.coupling_db = initial_coupling_db
+        self.confirm_frames = confirm_frames
+        self.min_energy_db = min_energy_db
+        self.noise_floor_db = None
+        self.run = 0
+        self.ducked = False
+        self.triggers = 0
+
+    def threshold_db(self, far_db):
+        threshold = max(self.min_energy_db, (self.noise_floor_db if self.noise_floor_db is not None else -60.0) + self.snr_db)
+        if far_db is not None:
+            threshold = max(threshold, far_db + self.coupling_db + self.echo_margin_db)
+        return threshold
+
+    def _learn(self, mic_db, far_db):
+        if far_db is None:
+            if self.noise_floor_db is None:
+                self.noise_floor_db = mic_db
+            rate = 0.3 if mic_db < self.noise_floor_db else 0.01
+            self.noise_floor_db += rate * (mic_db - self.noise_floor_db)
+        elif far_db > -50:
+            # Echo-only frame: track how much of the playback level reaches the mic. Follow the upper envelope,
+            # since pauses inside the lookback window make single frames look far better coupled than they are
+            observed = mic_db - far_db
+            self.coupling_db += (0.2 if observed > self.coupling_db else 0.002) * (observed - self.coupling_db)
+
+    def process(self, frame, far_db=None):
+        """Return "duck", "stop", "resume" or None; far_db is the playback level, None when nothing plays"""
+        mic_db = 10 * np.log10(float(np.dot(frame, frame)) / len(frame) + 1e-12)
+        if mic_db < self.threshold_db(far_db):
+            self._learn(mic_db, far_db)
+            self.run = 0
+            if self.ducked:
+                self.ducked = False
+                return "resume"
+            return None
+        if far_db is None:
+            return None
+        self.run += 1
+        if self.run >= self.confirm_frames:
+            self.run = 0
+            self.ducked = False
+            self.triggers += 1
+            return "stop"
+        if not self.ducked:
+            self.ducked = True
+            return "duck"
+        return None
+
+class BargeInMonitor:
+    """Watches the shared microphone while the player is busy and stops playback when the user talks over it"""
+
+    def __init__(self, player, duck_volume=0.3):
+        self.player = player
+        self.duck_volume = duck_volume
+        self.detector = BargeInDetector()
+        self.subscription = None
+        self.thread = None
+        self.running = False
+        self.on_barge_in = None
+
+    def start(self, on_barge_in, bus=None):
+        """on_barge_in() runs on the monitor thread right after playback was stopped"""
+        if self.running:
+            return
+        if bus is None:
+            from Backend.AudioCapture import capture_bus as bus
+        self.on_barge_in = on_barge_in
+        self.subscription = bus.subscribe("barge-in", SAMPLE_RATE, SAMPLE_RATE * FRAME_MS // 1000, np.float32, seconds=2)
+        bus.start()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print("[BargeIn] Monitoring the microphone during speech")
+
+    def _run(self):
+        while self.running:
+            frame = self.subscription.read_frame(timeout=0.5)
+            if frame is None:
+                continue
+            action = self.detector.process(frame, self.player.far_end_level())
+            if action == "duck":
+                self.player.set_volume(self.duck_volume)
+            elif action == "resume":
+                self.player.set_volume(1.0)
+            elif action == "stop":
+                self.player.stop()
+                self.player.set_volume(1.0)
+                print(f"[BargeIn] User spoke over playback (echo coupling {self.detector.coupling_db:.0f} dB)")
+                if self.on_barge_in:
+                    try:
+                        self.on_barge_in()
+                    except Exception as e:
+                        print(f"[BargeIn] Callback error: {e}")
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
+
+def benchmark_barge_in(seconds=8.0, onset=5.0, coupling_db=-12.0):
+    """Assistant speech with room echo, then the user starts talking at `onset`: report false triggers and reaction"""
+    rng = np.random.default_rng(3)
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    syllables = 0.5 + 0.5 * np.sign(np.sin(2 * np.pi * 3 * t))  # Bursty far-end speech
+    far = 0.3 * syllables * np.sin(2 * np.pi * 200 * t) * (1 + 0.5 * np.sin(2 * np.pi * 900 * t))
+    echo = np.roll(far, int(0.04 * SAMPLE_RATE)) * 10 ** (coupling_db / 20)  # 40 ms acoustic delay
+    user = np.where(t >= onset, 0.2 * np.sin(2 * np.pi * 150 * t) * (1 + 0.6 * np.sin(2 * np.pi * 1100 * t)), 0)
+    mic = (echo + user + rng.normal(0, 0.002, len(t))).astype(np.float32)
+
+    envelope_db = 10 * np.log10((far[:len(far) // frame * frame].reshape(-1, frame) ** 2).mean(axis=1) + 1e-12)
+    detector = BargeInDetector()
+    for i in range(50):  # Half a second of room noise before the assistant starts
+        detector.process(rng.normal(0, 0.002, frame).astype(np.float32))
+    events = []
+    coupling_at_onset = None
+    started = time.perf_counter()
+    for index in range(len(mic) // frame):
+        if index * FRAME_MS / 1000 >= onset and coupling_at_onset is None:
+            coupling_at_onset = detector.coupling_db
+        stopped = any(e[0] == "stop" for e in events)
+        far_db = None if stopped else float(envelope_db[max(index - 15, 0):index + 1].max())
+        action = detector.process(mic[index * frame:(index + 1) * frame], far_db)
+        if action:
+            events.append((action, round(index * FRAME_MS / 1000, 2)))
+        if action == "stop" and index * FRAME_MS / 1000 < onset:
+            events.pop()  # A false stop: count it but keep the assistant talking
+            events.append(("false stop", round(index * FRAME_MS / 1000, 2)))
+    per_frame = (time.perf_counter() - started) / (len(mic) // frame)
+
+    false_stops = [e for e in events if e[0] == "false stop"]
+    reaction = next((e[1] - onset for e in events if e[0] == "stop" and e[1] >= onset), None)
+    reaction_text = f"{(reaction + FRAME_MS / 1000) * 1000:.0f} ms" if reaction is not None else "missed"
+    print(f"[BargeIn] {len(false_stops)} false stops on echo, stop {reaction_text} after the user started, "
+          f"learned coupling {coupling_at_onset:.1f} dB (true {coupling_db} dB), {per_frame * 1e6:.1f} us per frame")
+    return events
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_barge_in()
@@ -0,0 +1,118 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+
+def normalize_query(query):
+    """Cache key for a spoken/typed query: lowercased and stripped like QueryModifier, without punctuation"""
+    query = query.lower().strip()
+    query = re.sub(r"[^\w\s']", " ", query)
+    return re.sub(r"\s+", " ", query).strip()
+
+class PersistentCache:
+    """Thread-safe LRU cache with per-entry TTL, persisted to a JSON file"""
+
+    def __init__(self, path, max_entries=500, ttl=24 * 3600, name="Cache"):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self.entries = OrderedDict()  # key -> [value, expires_at, stored_at]
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # One writer at a time: refresh threads and foreground searches both save
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Load non-expired entries from disk"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[{self.name}] Ignoring unreadable cache file: {e}")
+            return
+        now = time.time()
+        with self.lock:
+            for key, entry in data:
+                if entry[1] > now:
+                    self.entries[key] = entry
+            self._evict()
+
+    def save(self):
+        """Atomically write the cache to disk"""
+        with self.save_lock:
+            with self.lock:
+                data = list(self.entries.items())
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[{self.name}] Could not save cache: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        """Return a fresh cached value and count the hit or miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_entry(self, key):
+        """Return (value, age_seconds) for an unexpired entry, or None; lets callers apply their own freshness rules"""
+        with self.lock:
+            entry = self.entries.get(key)
+            now = time.time()
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], now - entry[2]
+
+    def put(self, key, value, ttl=None):
+        """Store a value, evicting the least recently used entries, and persist"""
+        now = time.time()
+        with self.lock:
+            self.entries[key] = [value, now + (self.ttl if ttl is None else ttl), now]
+            self.entries.move_to_end(key)
+            self._evict()
+        self.save()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.save()
+
+    def stats(self):
+        """Hit/miss counters for logging"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self.entries),
+            }
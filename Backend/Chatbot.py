@@ -1,14 +1,22 @@
 from groq import Groq
-from json import load,dump
 import datetime
 from dotenv import dotenv_values
+from Backend.Resilience import call_with_retry
+from Backend.ConversationStore import get_conversation_store
+from Backend.ContextBuilder import get_context_builder
 
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
-client = Groq( api_key = GroqAPIKey )
-messages = []
+client = None
+
+def get_client():
+    """Create the Groq client on first use instead of at import"""
+    global client
+    if client is None:
+        client = Groq( api_key = GroqAPIKey )
+    return client
 
 System = f"""Hello, I am {Username}, You are a very accurate and advance AI chatbot named {Assistantname} which also have realtime up-to-date information of internet.
 *** Do not tell time until i ask, do not talk too much, just answer to the question.***
@@ -19,16 +27,6 @@ SystemChatBot = [
     {"role": "system",
     "content": System}]
 
-try:
-
-    with open(r"Data\ChatLog.json","r") as f:
-        messages = load(f)
-
-except:
-
-    with open(r"Data\ChatLog.json","w") as f:
-        dump([],f)
-
 def RealtimeInformation():
 
     data=""
@@ -55,39 +53,44 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
+def OpenStream(messages):
+
+    """ Start a streamed completion on Groq. Errors before the first token surface here. """
+
+    return get_client().chat.completions.create(
+    model = "llama3-70b-8192",
+    messages = messages,
+    max_tokens=1024,
+    temperature=0.7,
+    top_p=1,
+    stream=True,
+    stop=None)
+
+def ChatBotStream(Query):
+
+    """ This function will send the query to the Chatbot and yield the answer as it is generated. """
+
+    store = get_conversation_store()
+    messages, prompt_tokens = get_context_builder().build(SystemChatBot + [{"role": "system", "content": RealtimeInformation()}], f"{Query}")
+    print(f"[Chatbot] Prompt tokens: {prompt_tokens}")
+
+    # Opening the stream is retried with backoff; once tokens flow, errors reach the caller
+    completion = call_with_retry("groq", OpenStream, messages)
+
+    Answer =""
+    for chunk in completion:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            Answer += delta
+            yield delta.replace("</s>", "")
+
+    store.append_turn(f"{Query}", Answer.replace("</s>", ""))
+
 def ChatBot(Query):
 
     """ This function will send the query to the Chatbot and return the answer. """
 
-    try:
-        with open(r"Data\ChatLog.json","r") as f:
-            messages:dict = load(f)
-            
-        messages.append({"role": "user", "content": f"{Query}"})
-        completion = client.chat.completions.create(
-        model = "llama3-70b-8192",
-        messages = SystemChatBot + [{"role": "system", "content": RealtimeInformation()}] + messages,
-        max_tokens=1024,
-        temperature=0.7,
-        top_p=1,
-        stream=True,
-        stop=None)
-
-        Answer =""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
-        Answer = Answer.replace("</s>", "")
-        messages.append({"role": "assistant", "content": Answer})
-
-        with open(r"Data\ChatLog.json","w") as f:
-            dump(messages,f,indent=4)
-        return AnswerModifier(Answer=Answer)
-    
-    except:
-        with open(r"Data\ChatLog.json","w") as f:
-            dump([],f,indent=4)
-        return ChatBot(Query)
+    return AnswerModifier(Answer="".join(ChatBotStream(Query)))
 
 if __name__ == "__main__":
 
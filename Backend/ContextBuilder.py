@@ -0,0 +1,100 @@
+import re
+import threading
+
+CONTEXT_TOKEN_BUDGET = 3000   # Prompt tokens per request (system + summary + history + query)
+SUMMARY_TOKEN_BUDGET = 300    # Cap for the rolling summary of older turns
+MAX_SCAN_MESSAGES = 200       # Newest messages considered for the verbatim window
+SCAN_PAGE = 16                # Messages fetched per read while filling the window
+MESSAGE_OVERHEAD = 4          # Role and separator tokens added per chat message
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text):
+    """Approximate BPE token count: one per word or symbol, plus one per extra 6 characters of long words"""
+    return sum(1 + (len(tok) - 1) // 6 for tok in _TOKEN_PATTERN.findall(text))
+
+def count_message_tokens(messages):
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+def _first_sentence(text, limit=160):
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    return sentence if len(sentence) <= limit else sentence[:limit].rsplit(" ", 1)[0] + "..."
+
+class ContextBuilder:
+    """Fits the newest turns into a token budget and folds older ones into a cached rolling summary"""
+
+    def __init__(self, store, budget=CONTEXT_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET):
+        self.store = store
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.lock = threading.Lock()
+        self.last_prompt_tokens = 0
+
+    def _summary(self, first_kept_id):
+        """Extend the stored summary with every message older than first_kept_id"""
+        with self.lock:
+            summary = self.store.get_meta("summary", "")
+            upto = int(self.store.get_meta("summary_upto", "0"))
+            folded = self.store.rows_between(upto, first_kept_id, limit=MAX_SCAN_MESSAGES)
+            if not folded:
+                return summary
+
+            lines = summary.split("\n") if summary else []
+            for _, role, content in folded:
+                lines.append(f"{'User' if role == 'user' else 'Assistant'}: {_first_sentence(content)}")
+            # Keep the newest lines within the summary budget
+            while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_budget:
+                lines.pop(0)
+            summary = "\n".join(lines)
+
+            self.store.set_meta(summary=summary, summary_upto=str(folded[-1][0]))
+            return summary
+
+    def build(self, system_messages, query):
+        """Return (messages, prompt_tokens) for system prompt + summary + recent history + query"""
+        query_message = {"role": "user", "content": query}
+        used = count_message_tokens(system_messages) + count_message_tokens([query_message])
+        history_budget = self.budget - used - self.summary_budget - MESSAGE_OVERHEAD
+
+        # Walk back from the newest message a page at a time until the budget is spent
+        kept = []
+        newest_id = None
+        page = self.store.recent_rows(SCAN_PAGE)
+        full = False
+        while page and not full and len(kept) < MAX_SCAN_MESSAGES:
+            newest_id = newest_id or page[-1][0]
+            for row_id, role, content in reversed(page):
+                tokens = count_tokens(content) + MESSAGE_OVERHEAD
+                if tokens > history_budget:
+                    full = True
+                    break
+                history_budget -= tokens
+                kept.append((row_id, role, content))
+            if not full:
+                page = self.store.rows_between(0, page[0][0], limit=SCAN_PAGE)
+        kept.reverse()
+
+        summary_messages = []
+        if newest_id is not None:
+            first_kept_id = kept[0][0] if kept else newest_id + 1
+            summary = self._summary(first_kept_id)
+            if summary:
+                summary_messages = [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}]
+
+        messages = list(system_messages) + summary_messages + [{"role": role, "content": content} for _, role, content in kept] + [query_message]
+        self.last_prompt_tokens = count_message_tokens(messages)
+        return messages, self.last_prompt_tokens
+
+_builder = None
+_builder_lock = threading.Lock()
+
+def get_context_builder():
+    """Return the process-wide builder bound to the shared conversation store"""
+    global _builder
+    with _builder_lock:
+        if _builder is None:
+            from Backend.ConversationStore import get_conversation_store
+            _builder = ContextBuilder(get_conversation_store())
+        return _builder
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+DB_PATH = os.path.join("Data", "ChatLog.db")
+LEGACY_JSON_PATH = os.path.join("Data", "ChatLog.json")
+HISTORY_LIMIT = 50  # Messages sent back to the model with each request
+
+class ConversationStore:
+    """Append-only chat history in SQLite (WAL) shared by ChatBot and RealtimeSearchEngine"""
+
+    def __init__(self, path=DB_PATH, legacy_path=LEGACY_JSON_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created REAL NOT NULL)""")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self._migrate(legacy_path)
+
+    def _migrate(self, legacy_path):
+        """Import the old ChatLog.json once"""
+        if self.get_meta("migrated_json") or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                messages = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ConversationStore] Skipping unreadable {legacy_path}: {e}")
+            messages = []
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO messages (role, content, created) VALUES (?, ?, ?)",
+                [(m["role"], m["content"], now) for m in messages if "role" in m and "content" in m])
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)", (legacy_path,))
+        print(f"[ConversationStore] Migrated {len(messages)} messages from {legacy_path}")
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, **values):
+        """Write one or more metadata values in a single transaction"""
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", values.items())
+
+    def append(self, role, content):
+        """Append one message and return its id"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO messages (role, content, created) VALUES (?, ?, ?)", (role, content, time.time()))
+        return cursor.lastrowid
+
+    def append_turn(self, user_content, assistant_content):
+        """Append a user/assistant pair in one transaction"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO messages (role, content, created) VALUES (?, ?, ?)",
+                [("user", user_content, now), ("assistant", assistant_content, now)])
+
+    def recent_rows(self, limit=HISTORY_LIMIT):
+        """Last `limit` messages as (id, role, content), oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, role, content FROM messages ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        rows.reverse()
+        return rows
+
+    def rows_between(self, after_id, before_id, limit=HISTORY_LIMIT):
+        """Up to `limit` newest messages with after_id < id < before_id as (id, role, content), oldest first"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, role, content FROM messages WHERE id > ? AND id < ? ORDER BY id DESC LIMIT ?",
+                (after_id, before_id, limit)).fetchall()
+        rows.reverse()
+        return rows
+
+    def recent(self, limit=HISTORY_LIMIT):
+        """Last `limit` messages in the chat-completions format, oldest first"""
+        return [{"role": role, "content": content} for _, role, content in self.recent_rows(limit)]
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM messages")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_conversation_store():
+    """Return the process-wide store, opening it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConversationStore()
+        return _store
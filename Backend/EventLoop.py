@@ -0,0 +1,120 @@
+import sys
+import time
+import asyncio
+import threading
+import concurrent.futures
+
+class BackendLoop:
+    """One long-lived asyncio loop on a dedicated thread for all backend coroutines
+
+    Anything that benefits from staying warm between commands (WebSocket clients, HTTP sessions, automation
+    coroutines, the request scheduler) lives on this loop instead of a fresh asyncio.run() per call. Other
+    threads hand work over with submit(), which returns a concurrent.futures.Future."""
+
+    def __init__(self, name="backend-loop"):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.cleanups = []  # async callables run before the loop stops (close sessions, sockets)
+        self.submitted = 0
+
+    def start(self):
+        """Start the loop thread if it is not running yet; returns the loop"""
+        with self.lock:
+            if self.loop is not None and self.thread.is_alive():
+                return self.loop
+            ready = threading.Event()
+
+            def run():
+                self.loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self.loop)
+                ready.set()
+                self.loop.run_forever()
+                self.loop.close()
+
+            self.thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self.thread.start()
+            ready.wait()
+            print("[EventLoop] Backend loop started")
+            return self.loop
+
+    def in_loop_thread(self):
+        return self.thread is not None and threading.current_thread() is self.thread
+
+    def submit(self, coro):
+        """Schedule a coroutine from any thread and return a concurrent.futures.Future for its result"""
+        loop = self.start()
+        self.submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block for its result (never call this from the loop thread itself)"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("BackendLoop.run() would deadlock on the loop thread; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread"""
+        self.start().call_soon_threadsafe(callback, *args)
+
+    def register_cleanup(self, cleanup):
+        """cleanup() is an async callable awaited on the loop at stop(), e.g. a session's close"""
+        self.cleanups.append(cleanup)
+
+    def stop(self, timeout=5):
+        """Run the registered cleanups, then stop the loop thread"""
+        if self.loop is None or not self.thread.is_alive():
+            return
+
+        async def shutdown():
+            for cleanup in reversed(self.cleanups):
+                try:
+                    await cleanup()
+                except Exception as e:
+                    print(f"[EventLoop] Cleanup error: {e}")
+            self.cleanups.clear()
+
+        if not self.in_loop_thread():
+            try:
+                self.submit(shutdown()).result(timeout)
+            except Exception as e:
+                print(f"[EventLoop] Shutdown error: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        print(f"[EventLoop] Backend loop stopped after {self.submitted} submitted coroutines")
+
+# Global instance for easy access
+backend_loop = BackendLoop()
+
+def benchmark_submit(commands=200):
+    """Per-command overhead of asyncio.run() against submitting to the long-lived loop"""
+    async def command():
+        await asyncio.to_thread(lambda: None)
+        return True
+
+    started = time.perf_counter()
+    for _ in range(commands):
+        asyncio.run(command())
+    per_run = (time.perf_counter() - started) / commands
+
+    loop = BackendLoop()
+    loop.start()
+    started = time.perf_counter()
+    for _ in range(commands):
+        loop.run(command())
+    per_submit = (time.perf_counter() - started) / commands
+    loop.stop()
+
+    print(f"[EventLoop] asyncio.run per command {per_run * 1000:.2f}ms, backend loop submit {per_submit * 1000:.2f}ms")
+    return per_run, per_submit
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_submit()
@@ -1,10 +1,13 @@
 import asyncio
+import sys
+import time
 from random import randint
 from PIL import Image
-import requests
+import aiohttp
 from dotenv import get_key
 import os
 from time import sleep
+from Backend.EventLoop import backend_loop
 
 # Global flag for test mode
 TEST_MODE = False
@@ -31,31 +34,133 @@ def open_images(prompt):
 
 API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
 headers = {"Authorization": f"Bearer {get_key('.env', 'HuggingFaceAPIKey')}"}
+IMAGE_COUNT = 4
+MAX_CONCURRENCY = 4  # Requests in flight against the inference API at once
+REQUEST_TIMEOUT = 60  # Seconds for one attempt, connect included
+TOTAL_TIMEOUT = 150  # Budget for a whole prompt, retries and loading waits included (below the scheduler's 180 s)
+MAX_ATTEMPTS = 4
+MAX_LOADING_WAIT = 60  # Longest single wait on a 503 "model is loading"
+CHUNK_SIZE = 64 * 1024
 
-async def query(payload):
-    response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
-    return response.content
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class ImageClient:
+    """Inference API client on the backend loop: one keep-alive session shared by every generation
+
+    Requests go through a semaphore so a burst of prompts cannot open more connections than the pool holds.
+    A 503 while the model loads is retried after the estimated_time the API sends back, and images are
+    streamed to a .part file that is renamed once complete, so a failed download never leaves a broken .jpg."""
+
+    def __init__(self, url=API_URL, headers=headers, concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS,
+                 total_timeout=TOTAL_TIMEOUT):
+        self.url = url
+        self.headers = headers
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.attempts = attempts
+        self.total_timeout = total_timeout
+        self.session = None
+        self.semaphore = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    async def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=10))
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            backend_loop.register_cleanup(self.close)
+        return self.session
+
+    async def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying a 503/429, from the API's estimated_time when it sends one"""
+        try:
+            estimated = float((await response.json(content_type=None)).get("estimated_time", 0))
+        except (ValueError, AttributeError, aiohttp.ClientError):
+            estimated = 0
+        return min(max(estimated, 2 ** attempt), MAX_LOADING_WAIT)
+
+    async def generate(self, payload, path, deadline=None):
+        """POST one prompt and stream the image to `path`; returns the path, or None if it failed
+
+        Attempts, loading waits and the download all fit before `deadline` (loop time, default total_timeout)."""
+        session = await self._session()
+        loop = asyncio.get_running_loop()
+        deadline = deadline or loop.time() + self.total_timeout
+        partial = path + ".part"
+        for attempt in range(self.attempts):
+            delay, reason = None, None
+            try:
+                async with self.semaphore:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    self.stats["requests"] += 1
+                    timeout = aiohttp.ClientTimeout(total=min(self.timeout, remaining), sock_connect=10)
+                    async with session.post(self.url, json=payload, timeout=timeout) as response:
+                        if response.status in (503, 429):
+                            delay = await self._retry_delay(response, attempt)
+                            reason = "model loading" if response.status == 503 else "rate limited"
+                        elif response.status != 200 or not response.content_type.startswith("image/"):
+                            print(f"[GenerateImages] API returned {response.status}: {(await response.text())[:200]}")
+                            break
+                        else:
+                            # File I/O runs in worker threads so a slow disk never stalls the shared loop
+                            f = await asyncio.to_thread(open, partial, "wb")
+                            try:
+                                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                    await asyncio.to_thread(f.write, chunk)
+                            finally:
+                                await asyncio.to_thread(f.close)
+                            await asyncio.to_thread(os.replace, partial, path)
+                            return path
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                print(f"[GenerateImages] Request failed: {type(e).__name__} {e}")
+                delay, reason = 2 ** attempt, type(e).__name__
+            if delay >= deadline - loop.time():
+                break
+            if attempt + 1 < self.attempts:
+                # Wait outside the semaphore so other prompts keep their slots
+                self.stats["retries"] += 1
+                print(f"[GenerateImages] {reason.capitalize()}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        self.stats["failures"] += 1
+        await asyncio.to_thread(_remove_partial, partial)
+        return None
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
 
-async def generate_images(prompt:str):
+# Global instance for easy access
+image_client = ImageClient()
+
+async def generate_images(prompt:str, folder="Data", client=None):
+    client = client or image_client
+    deadline = asyncio.get_running_loop().time() + client.total_timeout
     tasks = []
-    for _ in range(4):
+    for i in range(IMAGE_COUNT):
         payload = {
             "inputs": f"{prompt}, quality=4K, sharpness=maximum, Ultra High details, high resolution, seed = {randint(0, 1000000)}",
         }
-        task = asyncio.create_task(query(payload))
-        tasks.append(task)
-    image_bytes_list = await asyncio.gather(*tasks)
-    for i, image_bytes in enumerate(image_bytes_list):
-        with open(fr"Data\{prompt.replace(' ', '_')}{i + 1}.jpg", "wb") as f:
-            f.write(image_bytes)
-    return True
+        path = os.path.join(folder, f"{prompt.replace(' ', '_')}{i + 1}.jpg")
+        tasks.append(asyncio.create_task(client.generate(payload, path, deadline)))
+    paths = await asyncio.gather(*tasks)
+    saved = [path for path in paths if path]
+    print(f"[GenerateImages] {len(saved)}/{IMAGE_COUNT} images saved")
+    return bool(saved)
 
 def GenerateImages(prompt:str, test_mode=False):
     global TEST_MODE
     TEST_MODE = test_mode
     try:
         print(f"[GenerateImages] Generating images for prompt: {prompt}")
-        asyncio.run(generate_images(prompt))
+        if not backend_loop.run(generate_images(prompt), timeout=image_client.total_timeout + 5):
+            return False
         print(f"[GenerateImages] Images generated. Opening images...")
         open_images(prompt)
         print(f"[GenerateImages] Done.")
@@ -64,7 +169,98 @@ def GenerateImages(prompt:str, test_mode=False):
         print(f"[GenerateImages] Error: {e}")
         return False
 
+def _mock_image():
+    import io
+    buffer = io.BytesIO()
+    Image.new("RGB", (512, 512), (40, 90, 160)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+def benchmark_image_client(loading_seconds=1.0, latency=0.3, rounds=2):
+    """Generate against a local mock inference server that is "loading" at first, then slow but healthy"""
+    import json
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    image = _mock_image()
+    started = time.perf_counter()
+    state = {"in_flight": 0, "peak": 0, "connections": set(), "loading": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so pooled connections can be reused
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                state["connections"].add(self.client_address)
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            try:
+                if self.path.endswith("/broken"):
+                    # Dies halfway through the image
+                    self.send_response(200)
+                    self.send_header("Content-Type", "image/jpeg")
+                    self.send_header("Content-Length", str(len(image)))
+                    self.end_headers()
+                    self.wfile.write(image[:len(image) // 2])
+                    self.close_connection = True
+                    return
+                remaining = loading_seconds - (time.perf_counter() - started)
+                if self.path.endswith("/loading") or remaining > 0:
+                    with lock:
+                        state["loading"] += 1
+                    self._reply(503, "application/json",
+                                json.dumps({"error": "Model is currently loading", "estimated_time": remaining if remaining > 0 else 5}).encode())
+                    return
+                time.sleep(latency)
+                self._reply(200, "image/jpeg", image)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+
+        def _reply(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ImageClient(url=f"http://127.0.0.1:{server.server_address[1]}/models/mock", headers={}, concurrency=2, timeout=10)
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            for run in range(rounds):
+                begun = time.perf_counter()
+                ok = backend_loop.run(generate_images(f"benchmark round {run + 1}", folder=folder, client=client), timeout=60)
+                files = [f for f in os.listdir(folder) if f.endswith(".jpg")]
+                valid = all(Image.open(os.path.join(folder, f)).size == (512, 512) for f in files)
+                print(f"[GenerateImages] Round {run + 1}: ok={ok} in {(time.perf_counter() - begun) * 1000:.0f}ms, "
+                      f"{len(files)} files on disk, all valid={valid}")
+            print(f"[GenerateImages] {client.stats['requests']} requests, {state['loading']} answered 503 loading, "
+                  f"{client.stats['failures']} failures; {len(state['connections'])} TCP connections opened, "
+                  f"peak {state['peak']} in flight (cap {client.concurrency})")
+            for endpoint in ("loading", "broken"):
+                failing = ImageClient(url=f"http://127.0.0.1:{server.server_address[1]}/models/{endpoint}", headers={},
+                                      concurrency=2, timeout=10, total_timeout=3)
+                begun = time.perf_counter()
+                ok = backend_loop.run(generate_images(f"benchmark {endpoint}", folder=folder, client=failing), timeout=10)
+                leftovers = [f for f in os.listdir(folder) if "benchmark_" + endpoint in f]
+                print(f"[GenerateImages] Always-{endpoint} server: ok={ok} after {(time.perf_counter() - begun) * 1000:.0f}ms "
+                      f"(budget {failing.total_timeout}s), {failing.stats['requests']} requests, files left: {leftovers}")
+        return client.stats
+    finally:
+        server.shutdown()
+        backend_loop.stop()
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_image_client()
+        sys.exit(0)
     # Only run this block if the script is executed directly
     while True:
         with open(r"Frontend\Files\ImageGeneratoion.data", "r") as f:
@@ -0,0 +1,324 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import threading
+from collections import Counter, namedtuple
+import numpy as np
+from Backend.Cache import normalize_query
+
+LABELED_LOG_PATH = os.path.join("Data", "IntentLog.jsonl")
+CONFIDENCE_THRESHOLD = 0.85   # Below this FirstLayerDMM falls through to Cohere
+MIN_EXAMPLES_PER_CLASS = 20   # The model is not trusted for a class until it has seen this many
+RETRAIN_EVERY = 25            # Retrain after this many new labeled decisions
+
+CATEGORIES = ("exit", "general", "realtime", "open", "close", "play", "generate image", "system", "content", "google search", "youtube search", "reminder")
+
+# Categories the model may answer on its own; every other category needs
+# argument extraction, which only the rules (or Cohere) can do reliably
+MODEL_CATEGORIES = ("general", "realtime")
+
+IntentResult = namedtuple("IntentResult", ["decision", "confidence", "source"])
+NO_DECISION = IntentResult([], 0.0, "none")
+
+def _split_targets(text):
+    """Split 'chrome, firefox and notepad' into individual targets"""
+    parts = re.split(r",|\band\b", text)
+    return [p.strip() for p in parts if p.strip()]
+
+_FILLERS = re.compile(r"\b(please|for me|can you|could you|would you|jarvis)\b")
+_QUESTION_WORDS = re.compile(r"\b(what|who|where|when|why|how|which|tell|about|is|are)\b")
+# Words that make a query (part) automation; if no rule claimed it the model must not either
+_COMMAND_WORDS = re.compile(r"\b(open|launch|close|quit|shut down|play|search|google|youtube|remind|reminder|generate|draw|image|picture|mute|unmute|volume)\b")
+
+# Objects that make "play ..." / "quit ..." conversation rather than a command ("play with me", "quit talking")
+_CONVERSATIONAL = re.compile(r"^(?:with|along|around|games?|a game|the game|dead|fair|it|that|this|me|you|now|something|anything)\b")
+_QUIT_CONVERSATIONAL = re.compile(_CONVERSATIONAL.pattern + r"|^\w+ing\b")
+
+def _clean(text):
+    return re.sub(r"\s+", " ", _FILLERS.sub("", text)).strip()
+
+def _targets_rule(verb, exclude=None):
+    def rule(match):
+        rest = _clean(match.group("rest"))
+        if exclude and exclude.match(rest):
+            return None
+        targets = _split_targets(rest)
+        # Long or question-like targets usually mean a mixed request
+        # ("open chrome and tell me about gandhi"), leave those to Cohere
+        if not targets or any(len(t.split()) > 3 or _QUESTION_WORDS.search(t) for t in targets):
+            return None
+        return [f"{verb} {t}" for t in targets]
+    return rule
+
+def _single_rule(category, exclude=None):
+    def rule(match):
+        rest = _clean(match.group("rest"))
+        if not rest or (exclude and exclude.match(rest)):
+            return None
+        return [f"{category} {rest}"]
+    return rule
+
+_SYSTEM_ALIASES = {
+    "mute": "mute", "unmute": "unmute",
+    "volume up": "volume up", "increase volume": "volume up", "increase the volume": "volume up", "turn up the volume": "volume up", "turn the volume up": "volume up",
+    "volume down": "volume down", "decrease volume": "volume down", "decrease the volume": "volume down", "turn down the volume": "volume down", "turn the volume down": "volume down",
+}
+
+def _system_rule(match):
+    return [f"system {_SYSTEM_ALIASES[match.group('rest')]}"]
+
+# (category, pattern, builder) - the builder turns a match into a decision list or None
+RULES = [
+    ("exit", re.compile(r"^(?:bye|goodbye|bye jarvis|goodbye jarvis|bye bye)$"), lambda m: ["exit"]),
+    ("system", re.compile(r"^(?:(?:please|jarvis) )?(?P<rest>" + "|".join(re.escape(k) for k in sorted(_SYSTEM_ALIASES, key=len, reverse=True)) + r")(?: please)?$"), _system_rule),
+    ("generate image", re.compile(r"^(?:please )?(?:generate|create|make|draw) (?:an |a )?(?:image|picture|photo)s? (?P<rest>.+)$"), _single_rule("generate image")),
+    ("youtube search", re.compile(r"^(?:please )?search (?:on )?youtube (?:for )?(?P<rest>.+)$"), _single_rule("youtube search")),
+    ("youtube search", re.compile(r"^(?:please )?search (?:for )?(?P<rest>.+) on youtube$"), _single_rule("youtube search")),
+    # A bare leading "google" is too often a product name ("google maps") to be a search
+    ("google search", re.compile(r"^(?:please )?(?:search google for|google search(?: for)?|google for) (?P<rest>.+)$"), _single_rule("google search")),
+    ("google search", re.compile(r"^(?:please )?search (?:for )?(?P<rest>.+?)(?: on google)?$"), _single_rule("google search")),
+    ("reminder", re.compile(r"^(?:please )?(?:set a reminder|remind me)(?: to| that| about| for)? (?P<rest>.+)$"), _single_rule("reminder")),
+    ("play", re.compile(r"^(?:please )?play (?P<rest>.+)$"), _single_rule("play", _CONVERSATIONAL)),
+    ("open", re.compile(r"^(?:please )?(?:open|launch|start) (?P<rest>.+)$"), _targets_rule("open")),
+    ("close", re.compile(r"^(?:please )?(?:close|shut down) (?P<rest>.+)$"), _targets_rule("close", _CONVERSATIONAL)),
+    ("close", re.compile(r"^(?:please )?quit (?P<rest>.+)$"), _targets_rule("close", _QUIT_CONVERSATIONAL)),
+]
+
+def match_rules(query):
+    """Return the decision of the first matching rule, or None"""
+    # Commas separate targets ("close chrome, firefox and notepad"); keep them as "and" through normalization
+    text = normalize_query(query.replace(",", " and "))
+    for category, pattern, build in RULES:
+        match = pattern.match(text)
+        if match:
+            decision = build(match)
+            if decision:
+                return decision
+    return None
+
+class IntentClassifier:
+    """Keyword rules plus a TF-IDF / logistic regression model in front of the Cohere decision model"""
+
+    def __init__(self, log_path=LABELED_LOG_PATH, threshold=CONFIDENCE_THRESHOLD):
+        self.log_path = log_path
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.seed_examples = []
+        self.vocab = {}
+        self.idf = None
+        self.weights = None
+        self.bias = None
+        self.classes = []
+        self.class_counts = Counter()
+        self.pending = 0
+        self.training = False
+
+    @staticmethod
+    def _tokens(text):
+        words = re.findall(r"[a-z0-9']+", normalize_query(text))
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _vectorize(self, text, vocab, idf):
+        counts = Counter(t for t in self._tokens(text) if t in vocab)
+        if not counts:
+            return [], []
+        idxs = [vocab[t] for t in counts]
+        vals = [(1 + math.log(c)) * idf[vocab[t]] for t, c in counts.items()]
+        norm = math.sqrt(sum(v * v for v in vals))
+        return idxs, [v / norm for v in vals]
+
+    def _load_examples(self):
+        examples = list(self.seed_examples)
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    label = self.label_for(entry.get("decision", []))
+                    if label:
+                        examples.append((entry["query"], label))
+        except FileNotFoundError:
+            pass
+        return examples
+
+    @staticmethod
+    def label_for(decision):
+        """Single-category label for a decision list, None for mixed decisions"""
+        categories = set()
+        for task in decision:
+            for func in sorted(CATEGORIES, key=len, reverse=True):
+                if task.startswith(func):
+                    categories.add(func)
+                    break
+        return categories.pop() if len(categories) == 1 else None
+
+    def add_seed_history(self, chat_history):
+        """Use the few-shot User/Chatbot pairs of the decision model as training data"""
+        for user, bot in zip(chat_history[::2], chat_history[1::2]):
+            label = self.label_for([t.strip() for t in bot["message"].split(",")])
+            if label:
+                self.seed_examples.append((user["message"], label))
+
+    def train(self, examples=None, epochs=200, lr=0.5, l2=1e-3):
+        """Fit the TF-IDF vocabulary and a multinomial logistic regression"""
+        examples = self._load_examples() if examples is None else examples
+        classes = sorted({label for _, label in examples})
+        if len(classes) < 2:
+            return False
+
+        doc_freq = Counter()
+        for text, _ in examples:
+            doc_freq.update(set(self._tokens(text)))
+        vocab = {tok: i for i, tok in enumerate(sorted(doc_freq))}
+        n_docs = len(examples)
+        idf = np.array([math.log((1 + n_docs) / (1 + doc_freq[tok])) + 1 for tok in sorted(doc_freq)])
+
+        X = np.zeros((n_docs, len(vocab)))
+        y = np.zeros((n_docs, len(classes)))
+        for row, (text, label) in enumerate(examples):
+            idxs, vals = self._vectorize(text, vocab, idf)
+            X[row, idxs] = vals
+            y[row, classes.index(label)] = 1.0
+
+        W = np.zeros((len(vocab), len(classes)))
+        b = np.zeros(len(classes))
+        for _ in range(epochs):
+            logits = X @ W + b
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            grad = (probs - y) / n_docs
+            W -= lr * (X.T @ grad + l2 * W)
+            b -= lr * grad.sum(axis=0)
+
+        with self.lock:
+            self.vocab, self.idf, self.weights, self.bias = vocab, idf, W, b
+            self.classes = classes
+            self.class_counts = Counter(label for _, label in examples)
+            self.pending = 0
+        print(f"[IntentClassifier] Trained on {n_docs} examples, {len(vocab)} features, classes: {classes}")
+        return True
+
+    def predict(self, query):
+        """Return (label, probability) from the model, or (None, 0.0) if untrained"""
+        with self.lock:
+            vocab, idf, W, b, classes = self.vocab, self.idf, self.weights, self.bias, self.classes
+        if W is None:
+            return None, 0.0
+        idxs, vals = self._vectorize(query, vocab, idf)
+        if not idxs:
+            return None, 0.0
+        logits = np.asarray(vals) @ W[idxs] + b
+        logits -= logits.max()
+        probs = np.exp(logits)
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return classes[best], float(probs[best])
+
+    def classify(self, query):
+        """Classify a query locally and return an IntentResult with a confidence in [0, 1]"""
+        decision = match_rules(query)
+        if decision:
+            return IntentResult(decision, 1.0, "rules")
+        if _COMMAND_WORDS.search(normalize_query(query)):
+            # A command the rules declined (mixed or conversational phrasing); only Cohere can split it
+            return IntentResult([], 0.0, "rules")
+
+        label, confidence = self.predict(query)
+        if label not in MODEL_CATEGORIES or self.class_counts[label] < MIN_EXAMPLES_PER_CLASS:
+            return IntentResult([], 0.0, "model") if label else NO_DECISION
+        return IntentResult([f"{label} {normalize_query(query)}"], confidence, "model")
+
+    def record(self, query, decision, latency_ms=None):
+        """Append a decision from the remote model to the labeled log and retrain in the background"""
+        entry = {"query": query, "decision": decision, "latency_ms": latency_ms, "time": time.time()}
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"[IntentClassifier] Could not write labeled log: {e}")
+            return
+
+        with self.lock:
+            self.pending += 1
+            retrain = self.pending >= RETRAIN_EVERY and not self.training
+            if retrain:
+                self.training = True
+        if retrain:
+            threading.Thread(target=self._background_train, daemon=True).start()
+
+    def _background_train(self):
+        try:
+            self.train()
+        except Exception as e:
+            print(f"[IntentClassifier] Training failed: {e}")
+        finally:
+            self.training = False
+
+# Global instance for easy access
+intent_classifier = IntentClassifier()
+
+def classify_intent(query):
+    """Classify a query with the global classifier"""
+    return intent_classifier.classify(query)
+
+def record_decision(query, decision, latency_ms=None):
+    """Record a remote decision as a labeled training example"""
+    intent_classifier.record(query, decision, latency_ms)
+
+def benchmark(corpus_path=LABELED_LOG_PATH, classifier=None, remote_latency_ms=None):
+    """Replay a labeled corpus and report hit rate, agreement and the latency saved
+
+    Each corpus line is a JSON object with 'query', 'decision' and optionally
+    'latency_ms' (the remote round trip the entry originally cost). Entries
+    without a latency use remote_latency_ms, or the mean of the known ones.
+    """
+    classifier = classifier or intent_classifier
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    if not corpus:
+        print("[IntentClassifier] Empty corpus")
+        return None
+
+    known = [e["latency_ms"] for e in corpus if e.get("latency_ms")]
+    if remote_latency_ms is None:
+        remote_latency_ms = sum(known) / len(known) if known else 0.0
+
+    hits = agree = 0
+    saved_ms = local_ms = 0.0
+    for entry in corpus:
+        start = time.perf_counter()
+        result = classifier.classify(entry["query"])
+        elapsed = (time.perf_counter() - start) * 1000
+        local_ms += elapsed
+        if result.confidence >= classifier.threshold:
+            hits += 1
+            expected = [normalize_query(t) for t in entry["decision"]]
+            agree += [normalize_query(t) for t in result.decision] == expected
+            saved_ms += (entry.get("latency_ms") or remote_latency_ms) - elapsed
+
+    report = {
+        "queries": len(corpus),
+        "hit_rate": hits / len(corpus),
+        "agreement_on_hits": agree / hits if hits else 0.0,
+        "mean_local_ms": local_ms / len(corpus),
+        "latency_saved_ms": saved_ms,
+    }
+    print(f"[IntentClassifier] {report['queries']} queries, hit rate {report['hit_rate']:.1%}, "
+          f"agreement {report['agreement_on_hits']:.1%}, local {report['mean_local_ms']:.3f} ms/query, "
+          f"saved {report['latency_saved_ms'] / 1000:.1f} s")
+    return report
+
+if __name__ == "__main__":
+    intent_classifier.train()
+    if len(sys.argv) > 1:
+        benchmark(sys.argv[1])
+    else:
+        while True:
+            print(classify_intent(input(">>> ")))
@@ -0,0 +1,315 @@
+import os
+import sys
+import time
+import wave
+import threading
+import numpy as np
+from Backend.VoiceActivity import VoiceActivityDetector
+
+KEYWORDS_DIR = os.path.join("Data", "Keywords")
+KEYWORDS = ("jarvis", "wake up", "stop")
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 480
+MAX_KEYWORD_SECONDS = 1.6  # Longer segments are sentences, left to the full recognizer
+DEFAULT_THRESHOLD = 6.0    # DTW distance accepted when a keyword has a single template
+THRESHOLD_MARGIN = 1.35    # Accept up to this multiple of the mean distance between enrolled templates
+
+class MFCCExtractor:
+    """13 MFCCs per 25 ms window with a 10 ms hop, cepstral-mean normalized; filterbank and DCT are precomputed"""
+
+    def __init__(self, rate=SAMPLE_RATE, window_ms=25, hop_ms=10, n_fft=512, n_mels=26, n_mfcc=13, trim_db=30):
+        self.trim_db = trim_db
+        self.window_samples = rate * window_ms // 1000
+        self.hop = rate * hop_ms // 1000
+        self.n_fft = n_fft
+        self.window = np.hamming(self.window_samples).astype(np.float32)
+
+        def hz_to_mel(hz):
+            return 2595 * np.log10(1 + hz / 700)
+        mel_points = np.linspace(hz_to_mel(20), hz_to_mel(rate / 2), n_mels + 2)
+        bins = np.floor((n_fft + 1) * 700 * (10 ** (mel_points / 2595) - 1) / rate).astype(int)
+        self.filterbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                self.filterbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                self.filterbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        n = np.arange(n_mels)
+        self.dct = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(n_mfcc)[:, None]).astype(np.float32)
+
+    def compute(self, samples):
+        """MFCC matrix (frames x 13) of a float32 or int16 signal, with leading and trailing silence trimmed"""
+        samples = np.asarray(samples)
+        samples = samples * np.float32(1 / 32768) if samples.dtype == np.int16 else samples.astype(np.float32)
+        if len(samples) < self.window_samples:
+            samples = np.pad(samples, (0, self.window_samples - len(samples)))
+        # VAD pre-roll and hangover pad every segment with room noise; cut it so only the word is compared.
+        # Loudness is judged before pre-emphasis, which would otherwise favour hiss over low voiced sounds.
+        raw = np.lib.stride_tricks.sliding_window_view(samples, self.window_samples)[::self.hop]
+        energy_db = 10 * np.log10((raw * raw).sum(axis=1) + 1e-10)
+        loud = np.flatnonzero(energy_db >= energy_db.max() - self.trim_db)
+        raw = raw[loud[0]:loud[-1] + 1]
+        frames = np.empty_like(raw)
+        frames[:, 1:] = raw[:, 1:] - 0.97 * raw[:, :-1]
+        frames[:, 0] = raw[:, 0] * 0.03
+        frames *= self.window
+        power = np.abs(np.fft.rfft(frames, self.n_fft)) ** 2
+        log_mel = np.log(power @ self.filterbank.T + 1e-10)
+        mfcc = log_mel @ self.dct.T
+        return mfcc - mfcc.mean(axis=0)
+
+def dtw_distance(a, b):
+    """Slope-constrained DTW (steps (1,1), (1,2), (2,1)) between two feature sequences, normalized by length
+
+    Each row only depends on the two rows before it, so the recurrence is vectorized along the template."""
+    n, m = len(a), len(b)
+    if n > 2 * m or m > 2 * n:
+        return np.inf
+    cost = np.sqrt(np.maximum((a * a).sum(1)[:, None] + (b * b).sum(1)[None, :] - 2 * a @ b.T, 0))
+    previous2 = np.full(m, np.inf)
+    previous = np.full(m, np.inf)
+    previous[0] = cost[0, 0]
+    best = np.empty(m)
+    for i in range(1, n):
+        best.fill(np.inf)
+        best[1:] = previous[:-1]
+        np.minimum(best[2:], previous[:-2], out=best[2:])
+        np.minimum(best[1:], previous2[:-1], out=best[1:])
+        previous2, previous = previous, cost[i] + best
+    return float(previous[-1] / (n + m))
+
+def read_wav(path):
+    with wave.open(path, "rb") as wav:
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+def write_wav(path, samples, rate=SAMPLE_RATE):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+class KeywordSpotter:
+    """Spots a few enrolled keywords on the microphone stream without running the full recognizer
+
+    A short-hangover VAD cuts the stream into segments; segments short enough to be a keyword are turned into
+    MFCCs and matched against enrolled templates with DTW. Listeners get (keyword, distance) on a match."""
+
+    def __init__(self, directory=KEYWORDS_DIR, keywords=KEYWORDS):
+        self.directory = directory
+        self.keywords = keywords
+        self.mfcc = MFCCExtractor()
+        self.templates = {}   # keyword -> [MFCC matrix]
+        self.thresholds = {}  # keyword -> accepted DTW distance
+        self.vad = VoiceActivityDetector(FRAME_SAMPLES, SAMPLE_RATE, start_frames=2, hangover_frames=5, preroll_frames=5,
+                                         max_segment_seconds=MAX_KEYWORD_SECONDS + 0.5)
+        self.listeners = []
+        self.is_active = lambda: True  # Set by the caller: only match while keywords matter (sleeping, speaking)
+        self.subscription = None
+        self.thread = None
+        self.running = False
+        self.detections = 0
+        self.segments_matched = 0
+        self.segment = []  # Frames of the speech segment being collected
+        self.speech_missed = threading.Event()  # Set when active speech matched no keyword (fallback to the recognizer)
+
+    def load_templates(self):
+        """Load Data/Keywords/<keyword>/*.wav; returns the number of templates"""
+        self.templates = {}
+        for keyword in self.keywords:
+            folder = os.path.join(self.directory, keyword)
+            if not os.path.isdir(folder):
+                continue
+            samples = [read_wav(os.path.join(folder, name)) for name in sorted(os.listdir(folder)) if name.endswith(".wav")]
+            if samples:
+                self.add_templates(keyword, samples)
+        count = sum(len(t) for t in self.templates.values())
+        print(f"[KeywordSpotter] Loaded {count} templates for {sorted(self.templates)}")
+        return count
+
+    def add_templates(self, keyword, recordings):
+        templates = [self.mfcc.compute(r) for r in recordings]
+        self.templates[keyword] = templates
+        pairs = [dtw_distance(a, b) for i, a in enumerate(templates) for b in templates[i + 1:]]
+        pairs = [p for p in pairs if np.isfinite(p)]
+        self.thresholds[keyword] = float(np.mean(pairs)) * THRESHOLD_MARGIN if pairs else DEFAULT_THRESHOLD
+
+    def enroll(self, keyword, recording):
+        """Save one recording of a keyword as a template"""
+        folder = os.path.join(self.directory, keyword)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{len(os.listdir(folder)) + 1}.wav")
+        write_wav(path, recording)
+        print(f"[KeywordSpotter] Enrolled {path}")
+        return path
+
+    def match(self, recording):
+        """Return (keyword, distance) of the best template match under its threshold, or (None, distance)"""
+        features = self.mfcc.compute(recording)
+        best_keyword, best_score, best_distance = None, np.inf, np.inf
+        for keyword, templates in self.templates.items():
+            distance = min(dtw_distance(features, template) for template in templates)
+            score = distance / self.thresholds[keyword]
+            if score < best_score:
+                best_keyword, best_score, best_distance = keyword, score, distance
+        if best_score <= 1.0:
+            return best_keyword, best_distance
+        return None, best_distance
+
+    def has_templates(self, keywords):
+        """True if any of `keywords` is enrolled"""
+        return any(keyword in self.templates for keyword in keywords)
+
+    def add_listener(self, callback):
+        """callback(keyword, distance) runs on the spotter thread"""
+        self.listeners.append(callback)
+
+    def process_frame(self, frame):
+        """Feed one 30 ms int16 frame; returns the detected keyword, if any"""
+        event = self.vad.process(frame)
+        if event == "start":
+            self.segment = [f.copy() for f in self.vad.take_preroll()]
+        elif self.vad.in_speech:
+            self.segment.append(frame.copy())
+        elif event == "end":
+            recording = np.concatenate(self.segment)
+            self.segment = []
+            if self.templates and self.is_active():
+                if len(recording) <= MAX_KEYWORD_SECONDS * SAMPLE_RATE:
+                    return self._match_segment(recording)
+                self.speech_missed.set()
+        return None
+
+    def _match_segment(self, recording):
+        started = time.perf_counter()
+        keyword, distance = self.match(recording)
+        self.segments_matched += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if keyword is None:
+            self.speech_missed.set()
+            return None
+        self.detections += 1
+        print(f"[KeywordSpotter] '{keyword}' (distance {distance:.2f}) matched in {elapsed_ms:.0f}ms after the segment ended")
+        for callback in self.listeners:
+            try:
+                callback(keyword, distance)
+            except Exception as e:
+                print(f"[KeywordSpotter] Listener error: {e}")
+        return keyword
+
+    def start(self, bus=None):
+        """Subscribe to the shared microphone and spot keywords on a background thread"""
+        if self.running:
+            return
+        if bus is None:
+            from Backend.AudioCapture import capture_bus as bus
+        self.subscription = bus.subscribe("keywords", SAMPLE_RATE, FRAME_SAMPLES, np.int16)
+        bus.start()
+        self.running = True
+        self.segment = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print("[KeywordSpotter] Listening for keywords")
+
+    def _run(self):
+        while self.running:
+            frame = self.subscription.read_frame(timeout=0.5)
+            if frame is not None:
+                self.process_frame(frame)
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
+
+# Global instance for easy access
+keyword_spotter = KeywordSpotter()
+
+def _synthetic_word(pattern, rng, rate=SAMPLE_RATE):
+    """A word stand-in: a sequence of (Hz, seconds) harmonic syllables with random pitch, tempo and noise"""
+    stretch = rng.uniform(0.85, 1.15)
+    shift = rng.uniform(0.95, 1.05)
+    pieces = []
+    for hz, seconds in pattern:
+        t = np.arange(int(seconds * stretch * rate)) / rate
+        envelope = np.sqrt(np.abs(np.sin(np.pi * t / t[-1])))
+        pieces.append(envelope * (np.sin(2 * np.pi * hz * shift * t) + 0.4 * np.sin(4 * np.pi * hz * shift * t)))
+    word = np.concatenate(pieces) * 6000 + rng.normal(0, 80, sum(len(p) for p in pieces))
+    return word.astype(np.int16)
+
+def benchmark_spotter(trials=20):
+    """Enroll synthetic 'words', then measure detection accuracy, match cost and idle CPU on the frame stream"""
+    patterns = {"jarvis": [(220, 0.18), (660, 0.22), (1800, 0.2)], "wake up": [(900, 0.25), (300, 0.2)],
+                "stop": [(2500, 0.08), (500, 0.25)]}
+    distractors = [[(400, 0.2), (400, 0.2), (1200, 0.3)], [(1500, 0.3)], [(700, 0.15), (1000, 0.15), (250, 0.3)]]
+    rng = np.random.default_rng(7)
+    spotter = KeywordSpotter(keywords=tuple(patterns))
+    for keyword, pattern in patterns.items():
+        spotter.add_templates(keyword, [_synthetic_word(pattern, rng) for _ in range(3)])
+
+    def run(words):
+        silence = (rng.normal(0, 80, int(0.6 * SAMPLE_RATE))).astype(np.int16)
+        stream = np.concatenate([np.concatenate((silence, w)) for w in words] + [silence])
+        found = []
+        for i in range(0, len(stream) - FRAME_SAMPLES + 1, FRAME_SAMPLES):
+            keyword = spotter.process_frame(stream[i:i + FRAME_SAMPLES])
+            if keyword:
+                found.append(keyword)
+        return found, len(stream) / SAMPLE_RATE
+
+    hits = 0
+    for _ in range(trials):
+        keyword = list(patterns)[rng.integers(len(patterns))]
+        found, _ = run([_synthetic_word(patterns[keyword], rng)])
+        hits += found == [keyword]
+    false_alarms = sum(len(run([_synthetic_word(d, rng)])[0]) for d in distractors for _ in range(trials // len(distractors)))
+
+    idle = (rng.normal(0, 80, 20 * SAMPLE_RATE)).astype(np.int16)
+    cpu = time.process_time()
+    for i in range(0, len(idle) - FRAME_SAMPLES + 1, FRAME_SAMPLES):
+        spotter.process_frame(idle[i:i + FRAME_SAMPLES])
+    idle_cpu = (time.process_time() - cpu) / 20
+
+    print(f"[KeywordSpotter] {hits}/{trials} keywords detected, {false_alarms} false alarms on "
+          f"{trials // len(distractors) * len(distractors)} other words, idle CPU {idle_cpu * 100:.1f}% of one core")
+    return hits, false_alarms, idle_cpu
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_spotter()
+    elif len(sys.argv) > 2 and sys.argv[1] == "--enroll":
+        # python -m Backend.KeywordSpotter --enroll "wake up": say the keyword three times
+        keyword = sys.argv[2]
+        from Backend.AudioCapture import capture_bus
+        subscription = capture_bus.subscribe("enroll", SAMPLE_RATE, FRAME_SAMPLES, np.int16)
+        capture_bus.start()
+        vad = VoiceActivityDetector(FRAME_SAMPLES, SAMPLE_RATE, hangover_frames=10)
+        recorded = 0
+        print(f"Say '{keyword}' three times, pausing in between")
+        segment = []
+        while recorded < 3:
+            frame = subscription.read_frame(timeout=1)
+            if frame is None:
+                continue
+            event = vad.process(frame)
+            if event == "start":
+                segment = [f.copy() for f in vad.take_preroll()]
+            elif vad.in_speech:
+                segment.append(frame.copy())
+            elif event == "end":
+                keyword_spotter.enroll(keyword, np.concatenate(segment))
+                recorded += 1
+        capture_bus.stop()
+    else:
+        keyword_spotter.load_templates()
+        keyword_spotter.add_listener(lambda keyword, distance: print(f"Detected: {keyword}"))
+        keyword_spotter.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            keyword_spotter.stop()
@@ -1,12 +1,29 @@
 import cohere 
+import os
+import time
 from rich import print
 from dotenv import dotenv_values
+from Backend.IntentClassifier import intent_classifier, record_decision
+from Backend.Cache import PersistentCache, normalize_query
+from Backend.Resilience import call_with_retry
 
 env_vars = dotenv_values(".env")
 CohereAPIKey = env_vars.get("CohereAPIKey")
-co = cohere.Client(api_key= CohereAPIKey)
+co = None
+
+def get_client():
+      """Create the Cohere client on first use instead of at import"""
+      global co
+      if co is None:
+            co = cohere.Client(api_key= CohereAPIKey)
+      return co
 funcs = ["exit","general","realtime","open","close","play","generate image","system","content","google search","youtube search","reminder"]
 messages = []
+MaxDecisionAttempts = 3
+
+# Categories listed in DecisionCacheSkip (comma separated, e.g. "realtime,general") are never cached
+DecisionCacheSkip = [c.strip() for c in (env_vars.get("DecisionCacheSkip") or "").split(",") if c.strip()]
+decision_cache = PersistentCache(os.path.join("Data", "DecisionCache.json"), max_entries=500, ttl=7 * 24 * 3600, name="DecisionCache")
 
 preamble = """
 You are a very accurate Decision-Making Model, which decides what kind of a query is given to you.
@@ -41,11 +58,12 @@ ChatHistory = [{"role": "User", "message": "how are you?"},
             {"role": "User", "message": "chat with me."}, 
             {"role": "Chatbot", "message": "general chat with me."}]
 
-def FirstLayerDMM(prompt:str="test"):
+intent_classifier.add_seed_history(ChatHistory)
+intent_classifier.train()
 
-      messages.append({"role": "user", "content": f"{prompt}"})
-      
-      stream = co.chat_stream( 
+def RemoteDecision(prompt):
+
+      stream = get_client().chat_stream( 
       model='command-r-plus',
       message=prompt,
       temperature=0.7,
@@ -70,14 +88,37 @@ def FirstLayerDMM(prompt:str="test"):
                   if task.startswith(func):
                         temp.append(task)
 
-      response = temp
-      
-      if "(query)" in response:
-            newresponse = FirstLayerDMM(prompt=prompt)
-            return newresponse
+      return temp
+
+def FirstLayerDMM(prompt:str="test"):
+
+      # Try the local classifier first and only pay for a Cohere round trip when it is unsure
+      local = intent_classifier.classify(prompt)
+      if local.confidence >= intent_classifier.threshold:
+            print(f"[Model] Local decision ({local.source}, {local.confidence:.2f}): {local.decision}")
+            return local.decision
+
+      cache_key = normalize_query(prompt)
+      cached = decision_cache.get(cache_key)
+      if cached is not None:
+            print(f"[Model] Cached decision: {cached} {decision_cache.stats()}")
+            return cached
+
+      messages.append({"role": "user", "content": f"{prompt}"})
+
+      # The model sometimes echoes the '(query)' placeholder; ask again a bounded number of times
+      for _ in range(MaxDecisionAttempts):
+            started = time.perf_counter()
+            response = call_with_retry("cohere", RemoteDecision, prompt)
+
+            if "(query)" not in response:
+                  record_decision(prompt, response, (time.perf_counter() - started) * 1000)
+                  if response and not any(task.startswith(skip) for task in response for skip in DecisionCacheSkip):
+                        decision_cache.put(cache_key, response)
+                  return response
 
-      else:
-            return response
+      print(f"[Model] No usable decision after {MaxDecisionAttempts} attempts, treating as general")
+      return [f"general {prompt}"]
 
 if __name__ == "__main__":
 
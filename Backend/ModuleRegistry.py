@@ -0,0 +1,107 @@
+import time
+import importlib
+import threading
+from collections import OrderedDict
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+class ModuleUnavailable(Exception):
+    """Raised when a capability's module failed to import or initialize"""
+
+class ModuleRegistry:
+    """Imports backend capabilities on first use or during a background warm-up, with per-module state and timings"""
+
+    def __init__(self):
+        self.specs = OrderedDict()  # name -> (module_path, init, priority)
+        self.modules = {}
+        self.states = {}
+        self.errors = {}
+        self.timings = {}  # name -> {"import_ms", "init_ms"}
+        self.locks = {}
+        self.listeners = []
+        self.warm_thread = None
+        self.created = time.perf_counter()
+
+    def register(self, name, module_path, init=None, priority=100):
+        """Declare a capability; init(module) runs once after the import (clients, caches, ...)"""
+        self.specs[name] = (module_path, init, priority)
+        self.states[name] = PENDING
+        self.locks[name] = threading.Lock()
+
+    def add_listener(self, callback):
+        """callback(name, state, detail) is called on every state change"""
+        self.listeners.append(callback)
+
+    def _set_state(self, name, state, detail=""):
+        self.states[name] = state
+        for callback in self.listeners:
+            try:
+                callback(name, state, detail)
+            except Exception as e:
+                print(f"[ModuleRegistry] Listener error: {e}")
+
+    def get(self, name):
+        """Return the module behind a capability, importing it now if the warm-up has not reached it yet"""
+        if self.states.get(name) == READY:
+            return self.modules[name]
+        with self.locks[name]:
+            if self.states[name] == READY:
+                return self.modules[name]
+            if self.states[name] == FAILED:
+                raise ModuleUnavailable(f"{name} is unavailable: {self.errors[name]}")
+            module_path, init, _ = self.specs[name]
+            self._set_state(name, LOADING)
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(module_path)
+                imported = time.perf_counter()
+                if init:
+                    init(module)
+            except Exception as e:
+                self.errors[name] = e
+                self.timings[name] = {"import_ms": (time.perf_counter() - started) * 1000, "init_ms": 0.0}
+                print(f"[ModuleRegistry] {name} failed to load: {e}")
+                self._set_state(name, FAILED, str(e))
+                raise ModuleUnavailable(f"{name} is unavailable: {e}") from e
+            self.timings[name] = {"import_ms": (imported - started) * 1000, "init_ms": (time.perf_counter() - imported) * 1000}
+            self.modules[name] = module
+            self._set_state(name, READY)
+            return module
+
+    def is_ready(self, name):
+        return self.states.get(name) == READY
+
+    def statuses(self):
+        return dict(self.states)
+
+    def warm(self, on_done=None):
+        """Load every registered module on a background thread, most important first"""
+        def worker():
+            for name in sorted(self.specs, key=lambda n: self.specs[n][2]):
+                try:
+                    self.get(name)
+                except ModuleUnavailable:
+                    pass
+            self.report()
+            if on_done:
+                on_done()
+
+        self.warm_thread = threading.Thread(target=worker, daemon=True)
+        self.warm_thread.start()
+        return self.warm_thread
+
+    def report(self):
+        """Print per-module import/init milliseconds"""
+        print("[ModuleRegistry] Startup timing report:")
+        total = 0.0
+        for name in sorted(self.specs, key=lambda n: self.specs[n][2]):
+            timing = self.timings.get(name)
+            if timing is None:
+                print(f"[ModuleRegistry]   {name:<16} {self.states[name]}")
+                continue
+            total += timing["import_ms"] + timing["init_ms"]
+            print(f"[ModuleRegistry]   {name:<16} {self.states[name]:<7} import {timing['import_ms']:8.1f}ms  init {timing['init_ms']:8.1f}ms")
+        print(f"[ModuleRegistry]   total {total:.1f}ms, all loaded {(time.perf_counter() - self.created) * 1000:.0f}ms after start")
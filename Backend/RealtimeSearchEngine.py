@@ -1,31 +1,118 @@
 from groq import Groq
 from googlesearch import search
-from json import load,dump
 from dotenv import dotenv_values
 import datetime
 import requests
+import os
+import time
+import threading
+from Backend.Resilience import call_with_retry
+from Backend.Cache import PersistentCache, normalize_query
+from Backend.ConversationStore import get_conversation_store
+from Backend.ContextBuilder import get_context_builder
 
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
-client = Groq( api_key = GroqAPIKey )
+FetchPages = env_vars.get("SearchFetchPages", "true").lower() != "false"  # Read result pages, not just snippets
+client = None
+_warmed_at = 0.0
+
+def get_client():
+    """Create the Groq client on first use instead of at import"""
+    global client
+    if client is None:
+        client = Groq( api_key = GroqAPIKey )
+    return client
+
+def warm_connection(max_age=60):
+    """Open the Groq HTTPS connection ahead of a likely completion with a cheap models.list() call"""
+    global _warmed_at
+    if time.time() - _warmed_at < max_age:
+        return
+    _warmed_at = time.time()
+    try:
+        get_client().models.list()
+    except Exception as e:
+        print(f"[RealtimeSearch] Could not warm the Groq connection: {e}")
 
 System = f"""Hello, I am {Username}, You are a very accurate and advance AI chatbot named {Assistantname} which have realtime up-to-date information of internet.
 *** Provide Answers In a Professional Way, make sure to add fullstops, comma, question mark and use proper grammar.***
 *** Just answer the question from the provided data in a professional way. ***"""
 
-try:
-    with open(r"Data\ChatLog.json","r") as f:
-        messages = load(f)
+# Freshness tiers: (seconds an answer is fresh, further seconds it may be served while a refresh runs)
+SEARCH_TIERS = {
+    "market": (30, 60),            # Prices move by the second
+    "news": (10 * 60, 30 * 60),
+    "reference": (6 * 3600, 24 * 3600),
+}
+MARKET_WORDS = ['stock', 'price', 'market', 'forecast', 'trading']
+NEWS_WORDS = ['news', 'today', 'latest', 'headline', 'current', 'weather', 'score', 'live', 'update', 'tonight', 'yesterday']
+
+search_cache = PersistentCache(os.path.join("Data", "SearchCache.json"), max_entries=300, name="SearchCache")
+search_stats = {"fresh": 0, "stale": 0, "miss": 0, "refreshes": 0}
+_stats_lock = threading.Lock()
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+def _count_search(outcome):
+    # Searches run on refresh threads, the speculation pool and callers at once
+    with _stats_lock:
+        search_stats[outcome] += 1
+
+def query_tier(query):
+    """Freshness tier of a raw query: market prices, news, or reference knowledge"""
+    words = query.lower()
+    if any(word in words for word in MARKET_WORDS):
+        return "market"
+    if any(word in words for word in NEWS_WORDS):
+        return "news"
+    return "reference"
+
+def _page_passages(query, results):
+    """Best passages from the result pages themselves, as [title, passage] pairs (empty when disabled or failed)"""
+    pages = [(title, rest[0]) for title, _, *rest in results if rest]
+    if not (FetchPages and pages):
+        return []
+    try:
+        from Backend.Retrieval import retrieve
+        packed, _ = retrieve(query, pages)
+        return [list(passage) for passage in packed]
+    except Exception as e:
+        print(f"[RealtimeSearch] Page retrieval failed, using descriptions only: {e}")
+        return []
+
+def _fetch_results(query, enhanced_query, tier):
+    """Scrape the top results as [title, description, url] triples, read their pages, and cache both together"""
+    results = [[i.title, i.description, i.url] for i in search(enhanced_query, advanced=True, num_results=5)]
+    entry = {"results": results, "passages": _page_passages(query, results)}
+    fresh, grace = SEARCH_TIERS[tier]
+    search_cache.put(normalize_query(enhanced_query), entry, ttl=fresh + grace)
+    return entry
+
+def _refresh_in_background(query, enhanced_query, tier):
+    key = normalize_query(enhanced_query)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
 
-except:
-    with open(r"Data\ChatLog.json","w") as f:
-        dump([],f)
+    def worker():
+        try:
+            _fetch_results(query, enhanced_query, tier)
+            _count_search("refreshes")
+        except Exception as e:
+            print(f"[RealtimeSearch] Background refresh failed: {e}")
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=worker, daemon=True).start()
 
 def GoogleSearch(query):
     # Enhance search query for real-time data
-    if any(word in query.lower() for word in ['stock', 'price', 'market', 'forecast', 'trading']):
+    if any(word in query.lower() for word in MARKET_WORDS):
         # Add "latest" and "today" to stock-related queries
         enhanced_query = f"{query} latest news today current price"
     else:
@@ -33,13 +120,37 @@ def GoogleSearch(query):
     
     print(f"[RealtimeSearch] Enhanced query: {enhanced_query}")
     
-    results = list(search(enhanced_query, advanced=True, num_results=5))
+    # Fresh results are reused; stale ones answer now while a refresh runs in the background.
+    # Page passages are cached with the results, so a hit never waits on page fetches
+    tier = query_tier(query)
+    fresh, _ = SEARCH_TIERS[tier]
+    cached = search_cache.get_entry(normalize_query(enhanced_query))
+    if cached is not None and isinstance(cached[0], list):
+        cached = ({"results": cached[0], "passages": []}, cached[1])  # Entry written before passages were cached
+    if cached is not None and cached[1] < fresh:
+        _count_search("fresh")
+        entry = cached[0]
+        print(f"[RealtimeSearch] Cached {tier} results ({cached[1]:.0f}s old)")
+    elif cached is not None:
+        _count_search("stale")
+        entry = cached[0]
+        print(f"[RealtimeSearch] Stale {tier} results ({cached[1]:.0f}s old), refreshing in the background")
+        _refresh_in_background(query, enhanced_query, tier)
+    else:
+        _count_search("miss")
+        entry = _fetch_results(query, enhanced_query, tier)
+    
     Answer = f"The search results for '{query}' are: \n[start]\n"
 
-    for i in results:
-        Answer += f"Title: {i.title}\nDescription: {i.description}\n\n"
+    for title, description, *_ in entry["results"]:
+        Answer += f"Title: {title}\nDescription: {description}\n\n"
 
     Answer += "[end]"
+
+    # Titles and descriptions are thin; add the best passages from the result pages themselves
+    if entry["passages"]:
+        from Backend.Retrieval import format_passages
+        Answer += "\n" + format_passages(entry["passages"])
     return Answer
 
 def AnswerModifier(Answer):
@@ -50,13 +161,12 @@ def AnswerModifier(Answer):
 
 """ Setting the variables, which will be used in the automation. """
 
-SystemChatBot = [
-    {"role": "system",
-    "content": System},
-    {"role": "user",
-    "content": "Hi"},
-    {"role": "assistant",
-    "content": "Hello, how can I help you?"}]
+# Immutable template; every request builds its own message list from it
+SYSTEM_TEMPLATE = (
+    ("system", System),
+    ("user", "Hi"),
+    ("assistant", "Hello, how can I help you?"),
+)
 
 def Information():
     data=""
@@ -76,45 +186,104 @@ def Information():
     data+=f"Time: {hour} hours :{minute} minutes :{second} seconds.\n"
     return data
     
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-
-    with open(r"Data\ChatLog.json","r") as f:
-        messages = load(f)
-    messages.append({"role": "user", "content": f"{prompt}"})
-
-    print(f"[RealtimeSearch] Processing query: {prompt}")
-    search_results = GoogleSearch(prompt)
-    SystemChatBot.append({"role": "system", "content": search_results})
-    
-    completion = client.chat.completions.create(
+def OpenStream(messages):
+    return get_client().chat.completions.create(
     model = "llama3-70b-8192",
-    messages = SystemChatBot + [{"role": "system", "content": Information()}] + messages,
+    messages = messages,
     temperature = 0.7,
     max_tokens = 2048,
     top_p = 1,
     stream = True,
     stop = None)
 
+def GroqLLM(messages):
+    """Default LLM backend: stream text deltas from Groq"""
+    completion = call_with_retry("groq", OpenStream, messages)
+    for chunk in completion:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+def build_messages(prompt, search_results, builder=None):
+    """Request-scoped prompt: template + this request's search results + current time + history + query"""
+    system_messages = [{"role": role, "content": content} for role, content in SYSTEM_TEMPLATE]
+    system_messages.append({"role": "system", "content": search_results})
+    system_messages.append({"role": "system", "content": Information()})
+    return (builder or get_context_builder()).build(system_messages, f"{prompt}")
+
+def RealtimeSearchEngineStream(prompt, llm=GroqLLM, searcher=GoogleSearch, store=None, builder=None, search_results=None):
+    """ Search the web for the prompt and yield the answer as it is generated.
+
+    Nothing module-level is modified, so concurrent queries cannot see each other's search results.
+    search_results skips the search when the caller already ran it (speculatively, next to the decision). """
+    store = store or get_conversation_store()
+
+    print(f"[RealtimeSearch] Processing query: {prompt}")
+    if search_results is None:
+        search_results = searcher(prompt)
+    messages, prompt_tokens = build_messages(prompt, search_results, builder)
+    print(f"[RealtimeSearch] Prompt tokens: {prompt_tokens}")
+
     Answer = ""
     
-    for chunk in completion:
-        if chunk.choices[0].delta.content:
-            Answer += chunk.choices[0].delta.content
+    for delta in llm(messages):
+        Answer += delta
+        yield delta.replace("</s>","")
     
     Answer = Answer.strip().replace("</s>","")
-    messages.append({"role": "assistant", "content": Answer})
+    store.append_turn(f"{prompt}", Answer)
+
+def RealtimeSearchEngine(prompt, **backends):
+    return AnswerModifier(Answer="".join(RealtimeSearchEngineStream(prompt, **backends)).strip())
+
+def stress_test(queries=32):
+    """Fire parallel queries at a stub search backend and stub LLM and check that no prompt sees another's results"""
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from Backend.ConversationStore import ConversationStore
+    from Backend.ContextBuilder import ContextBuilder
+
+    store = ConversationStore(path=":memory:", legacy_path="")
+    builder = ContextBuilder(store)
+    prompts = {}
+    template = [(role, content) for role, content in SYSTEM_TEMPLATE]
 
-    with open(r"Data\ChatLog.json","w") as f:
-        dump(messages,f,indent=4)
+    def searcher(query):
+        time.sleep(random.uniform(0, 0.02))
+        return f"The search results for '{query}' are: \n[start]\nTitle: result-{query.split()[-1]}\n[end]"
 
-    SystemChatBot.pop()
-    return AnswerModifier(Answer=Answer)
+    def llm(messages):
+        prompts[messages[-1]["content"]] = messages
+        for word in ("Here", " is", " the", " answer."):
+            time.sleep(random.uniform(0, 0.005))
+            yield word
+
+    with ThreadPoolExecutor(max_workers=queries) as pool:
+        answers = list(pool.map(lambda i: RealtimeSearchEngine(f"query {i}", llm=llm, searcher=searcher, store=store,
+                                                               builder=builder), range(queries)))
+
+    leaks = damaged = 0
+    for i in range(queries):
+        messages = prompts[f"query {i}"]
+        # Exactly one results message in the whole prompt, and it is this query's
+        results = [m["content"] for m in messages if "[start]" in m["content"]]
+        if len(results) != 1 or f"result-{i}\n" not in results[0]:
+            leaks += 1
+        # Every prompt starts with the untouched template
+        if [(m["role"], m["content"]) for m in messages[:len(template)]] != template:
+            damaged += 1
+    print(f"[RealtimeSearch] {queries} parallel queries: {queries - leaks} isolated prompts, {leaks} leaked, "
+          f"{sum(a == 'Here is the answer.' for a in answers)} complete answers, {damaged} prompts with a damaged template")
+    return leaks == 0 and damaged == 0
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--stress":
+        stress_test(int(sys.argv[2]) if len(sys.argv) > 2 else 32)
+        sys.exit()
 
     while True:
 
         prompt = input("Enter your query: ")
         print(RealtimeSearchEngine(prompt))
-
@@ -0,0 +1,141 @@
+import time
+import random
+import threading
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit is open"""
+
+class CircuitBreaker:
+    """Per-provider circuit: closed -> open after repeated failures -> half-open trial after a cool-down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go through right now"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_running = False
+                print(f"[Resilience] {self.name} circuit half-open, trying one request")
+            if self.state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print(f"[Resilience] {self.name} circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_running = False
+
+    def release(self):
+        """End a half-open trial without judging the provider (e.g. the request itself was invalid)"""
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[Resilience] {self.name} circuit open for {self.reset_timeout:.0f}s after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class RetryPolicy:
+    """Capped attempts with full-jitter exponential backoff"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=8.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+# Transport-level exception classes of the SDKs and HTTP clients (groq/openai, cohere/httpx, requests, sockets),
+# matched by name so none of them has to be importable here
+TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException", "ConnectTimeout",
+                    "ReadTimeout", "Timeout", "ConnectionError", "gaierror"}
+
+def is_retryable(error):
+    """Network errors, timeouts, rate limits and server errors are retried; client and programming errors are not"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+_breakers = {}
+_metrics = {}
+_lock = threading.Lock()
+DEFAULT_POLICY = RetryPolicy()
+
+def get_breaker(provider):
+    with _lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+            _metrics[provider] = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "short_circuits": 0, "retry_wait_seconds": 0.0}
+        return _breakers[provider]
+
+def _count(provider, key, amount=1):
+    with _lock:
+        _metrics[provider][key] += amount
+
+def call_with_retry(provider, fn, *args, policy=None, **kwargs):
+    """Call fn(*args, **kwargs) through the provider's circuit breaker, retrying transient errors"""
+    policy = policy or DEFAULT_POLICY
+    breaker = get_breaker(provider)
+    _count(provider, "calls")
+
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            _count(provider, "short_circuits")
+            raise CircuitOpenError(f"{provider} is unavailable, circuit open")
+        _count(provider, "attempts")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.release()
+                _count(provider, "failures")
+                raise
+            breaker.record_failure()
+            if attempt == policy.max_attempts - 1 or breaker.state == CircuitBreaker.OPEN:
+                _count(provider, "failures")
+                raise
+            wait = policy.delay(attempt)
+            print(f"[Resilience] {provider} attempt {attempt + 1} failed ({e}), retrying in {wait:.2f}s")
+            _count(provider, "retries")
+            _count(provider, "retry_wait_seconds", wait)
+            time.sleep(wait)
+        else:
+            breaker.record_success()
+            return result
+
+def retry_metrics():
+    """Per-provider counters, including the total time spent sleeping between retries"""
+    with _lock:
+        return {provider: dict(values, state=_breakers[provider].state) for provider, values in _metrics.items()}
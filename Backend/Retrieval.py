@@ -0,0 +1,266 @@
+import re
+import sys
+import math
+import time
+import asyncio
+from collections import Counter
+from urllib.parse import urlsplit
+import aiohttp
+from bs4 import BeautifulSoup
+from dotenv import dotenv_values
+from Backend.ContextBuilder import count_tokens
+from Backend.EventLoop import backend_loop
+
+env_vars = dotenv_values(".env")
+RETRIEVAL_TOKENS = int(env_vars.get("RetrievalTokens", "800"))  # Budget for page passages in the search prompt
+FETCH_TIMEOUT = 4.0
+PER_HOST_LIMIT = 2
+TOTAL_LIMIT = 10
+MAX_PAGE_BYTES = 1_500_000
+PASSAGE_TOKENS = 80
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.75 Safari/537.36"
+
+_WORD = re.compile(r"\w+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+_BOILERPLATE = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe"]
+
+class PageFetcher:
+    """Pooled HTTP client on the backend loop: one keep-alive session, a few connections per host"""
+
+    def __init__(self, per_host=PER_HOST_LIMIT, total=TOTAL_LIMIT, timeout=FETCH_TIMEOUT):
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+        self.session = None
+
+    async def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.total, limit_per_host=self.per_host, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT},
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+            backend_loop.register_cleanup(self.close)
+        return self.session
+
+    async def fetch(self, url):
+        """HTML of a page, or None if it failed, timed out or is not HTML"""
+        session = await self._session()
+        try:
+            async with session.get(url) as response:
+                if response.status != 200 or "html" not in response.headers.get("Content-Type", "html"):
+                    return None
+                # content.read(n) only returns what is buffered; read to EOF with a running cap instead
+                chunks, size = [], 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= MAX_PAGE_BYTES:
+                        break
+                body = b"".join(chunks)[:MAX_PAGE_BYTES]
+                try:
+                    return body.decode(response.charset or "utf-8", errors="replace")
+                except LookupError:
+                    # Unknown charset name in the headers
+                    return body.decode("utf-8", errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError) as e:
+            print(f"[Retrieval] Fetch failed for {urlsplit(url).netloc}: {type(e).__name__}")
+            return None
+
+    async def fetch_all(self, urls):
+        """HTML per url; a page that failed in any unexpected way is None instead of failing the others"""
+        pages = await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+        return [None if isinstance(page, BaseException) else page for page in pages]
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+def extract_text(html):
+    """Main-content paragraphs of a page: boilerplate removed, <article>/<main> preferred when present"""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_BOILERPLATE):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+    paragraphs = [" ".join(node.get_text(" ").split()) for node in root.find_all(["p", "li", "h1", "h2", "h3", "blockquote", "pre"])]
+    paragraphs = [p for p in paragraphs if len(p) >= 40]
+    if not paragraphs:
+        text = " ".join(root.get_text(" ").split())
+        paragraphs = [text] if text else []
+    return paragraphs
+
+def chunk_passages(paragraphs, max_tokens=PASSAGE_TOKENS):
+    """Group sentences into passages of about max_tokens, never splitting a sentence"""
+    passages = []
+    current, used = [], 0
+    for paragraph in paragraphs:
+        for sentence in _SENTENCE.split(paragraph):
+            tokens = count_tokens(sentence)
+            if current and used + tokens > max_tokens:
+                passages.append(" ".join(current))
+                current, used = [], 0
+            current.append(sentence)
+            used += tokens
+        if used >= max_tokens // 2:
+            passages.append(" ".join(current))
+            current, used = [], 0
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+def _terms(text):
+    return [word.lower() for word in _WORD.findall(text)]
+
+class BM25:
+    """Okapi BM25 over a fixed set of passages"""
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = [Counter(_terms(p)) for p in passages]
+        self.lengths = [sum(doc.values()) for doc in self.docs]
+        self.average = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        frequency = Counter(term for doc in self.docs for term in doc)
+        count = len(self.docs)
+        self.idf = {term: math.log(1 + (count - n + 0.5) / (n + 0.5)) for term, n in frequency.items()}
+
+    def scores(self, query):
+        terms = [t for t in set(_terms(query)) if t in self.idf]
+        scores = []
+        for doc, length in zip(self.docs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average or 1))
+            scores.append(sum(self.idf[t] * doc[t] * (self.k1 + 1) / (doc[t] + norm) for t in terms if t in doc))
+        return scores
+
+def pack_passages(ranked, budget):
+    """Take the best passages that fit the token budget, skipping ones already covered"""
+    packed, used, seen = [], 0, set()
+    for score, source, passage in ranked:
+        if score <= 0:
+            break
+        signature = tuple(_terms(passage)[:12])
+        tokens = count_tokens(passage)
+        if signature in seen or used + tokens > budget:
+            continue
+        seen.add(signature)
+        packed.append((source, passage))
+        used += tokens
+    return packed, used
+
+_fetcher = PageFetcher()
+
+def _rank_pages(query, results, pages, budget):
+    """Extract, chunk and BM25-rank the fetched pages (CPU-bound, run off the backend loop)"""
+    timings = {}
+    started = time.perf_counter()
+    candidates = []
+    for (title, _), html in zip(results, pages):
+        if html:
+            candidates.extend((title, passage) for passage in chunk_passages(extract_text(html)))
+    timings["extract_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    ranked = []
+    if candidates:
+        scores = BM25([passage for _, passage in candidates]).scores(query)
+        ranked = sorted(((score, title, passage) for score, (title, passage) in zip(scores, candidates)), key=lambda r: -r[0])
+    packed, tokens = pack_passages(ranked, budget)
+    timings["rank_ms"] = (time.perf_counter() - started) * 1000
+    timings.update(passages=len(candidates), packed=len(packed), tokens=tokens)
+    return packed, timings
+
+async def retrieve_async(query, results, budget=RETRIEVAL_TOKENS, fetcher=None):
+    """Fetch result pages concurrently, extract, chunk and rank passages; returns (passages, timings)"""
+    fetcher = fetcher or _fetcher
+    urls = [url for _, url in results]
+
+    started = time.perf_counter()
+    pages = await fetcher.fetch_all(urls)
+    fetch_ms = (time.perf_counter() - started) * 1000
+
+    # Parsing megabytes of HTML would stall every other coroutine on the shared loop
+    packed, timings = await asyncio.to_thread(_rank_pages, query, results, pages, budget)
+    timings.update(fetch_ms=fetch_ms, pages=sum(html is not None for html in pages))
+    return packed, timings
+
+def retrieve(query, results, budget=RETRIEVAL_TOKENS, timeout=FETCH_TIMEOUT + 2):
+    """Blocking wrapper: results are (title, url) pairs; returns ([(title, passage)], timings)"""
+    packed, timings = backend_loop.run(retrieve_async(query, results, budget), timeout=timeout)
+    print(f"[Retrieval] {timings['pages']}/{len(results)} pages, {timings['passages']} passages -> {timings['packed']} "
+          f"({timings['tokens']} tokens); fetch {timings['fetch_ms']:.0f}ms, extract {timings['extract_ms']:.0f}ms, "
+          f"rank {timings['rank_ms']:.0f}ms")
+    return packed, timings
+
+def format_passages(packed):
+    """Prompt text for the packed passages"""
+    lines = ["Relevant passages from the result pages:", "[start]"]
+    for title, passage in packed:
+        lines.append(f"From '{title}': {passage}\n")
+    lines.append("[end]")
+    return "\n".join(lines)
+
+_FIXTURE_FILLER = ("Visitors often ask about opening hours, ticket prices and the best time of day to go. "
+                   "The surrounding district has cafes, museums and river cruises that are popular in summer. ")
+
+def _fixture_pages():
+    return {
+        "/eiffel": f"<html><body><nav>Home | Travel | Contact</nav><article><h1>The Eiffel Tower</h1>"
+                   f"<p>{_FIXTURE_FILLER * 3}</p><p>The Eiffel Tower is 330 metres tall, including its antennas, and "
+                   f"was the tallest man-made structure in the world until 1930.</p><p>{_FIXTURE_FILLER * 2}</p>"
+                   f"</article><footer>Copyright travel site</footer><script>var tracking = 1;</script></body></html>",
+        "/paris": f"<html><body><main><p>{_FIXTURE_FILLER * 4}</p><p>Paris landmarks include Notre-Dame, the Louvre "
+                  f"and the tower on the Champ de Mars, which draws millions of visitors every year.</p></main></body></html>",
+        "/weather": f"<html><body><p>{_FIXTURE_FILLER * 2}</p><p>Spring in Paris is mild, with highs around 16 degrees "
+                    f"and frequent light showers.</p></body></html>",
+        "/slow": f"<html><body><p>This page is slow to respond but contains nothing about heights. {_FIXTURE_FILLER}</p></body></html>",
+        "/missing": None,
+        # Far larger than one network chunk, with the answer at the very end
+        "/long": f"<html><body><main><p>{_FIXTURE_FILLER * 1500}</p><p>From its top observation deck the Eiffel Tower "
+                 f"stands 276 metres tall above the Champ de Mars.</p></main></body></html>",
+    }
+
+def benchmark_retrieval(latency=0.15):
+    """Serve fixture pages from a local http.server (with latency) on several loopback hosts and run retrieval"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    pages = _fixture_pages()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency * (3 if self.path == "/slow" else 1))
+            body = pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hosts = ["127.0.0.1", "localhost", "127.0.0.1", "localhost", "127.0.0.1", "localhost"]
+    results = [(path.strip("/").title(), f"http://{host}:{port}{path}") for host, path in zip(hosts, pages)]
+    try:
+        query = "How tall is the Eiffel Tower?"
+        for run in ("cold", "warm"):
+            started = time.perf_counter()
+            packed, timings = retrieve(query, results, budget=200)
+            print(f"[Retrieval] {run} run {(time.perf_counter() - started) * 1000:.0f}ms for {len(results)} pages "
+                  f"of {latency * 1000:.0f}ms each (sequential would be {latency * 1000 * (len(results) + 2):.0f}ms)")
+        print(f"[Retrieval] Top passage: {packed[0][1][:100] if packed else None}")
+        print(f"[Retrieval] End of the {len(pages['/long']) // 1000} KB page reached: "
+              f"{any('observation deck' in passage for _, passage in packed)}")
+        return packed, timings
+    finally:
+        server.shutdown()
+        backend_loop.stop()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_retrieval()
@@ -1,14 +1,223 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import dotenv_values
+from collections import deque
 import os
+import sys
+import json
+import time
+import queue
+import threading
+import numpy as np
 import mtranslate as mt
+from Backend.AudioCapture import capture_bus, Subscription
+from Backend.VoiceActivity import VoiceActivityDetector
+
+try:
+    import vosk
+    HAVE_VOSK = True
+except ImportError:
+    HAVE_VOSK = False
 
 env_vars = dotenv_values(".env")
-InputLanguage = env_vars.get("InputLanguage")
+InputLanguage = env_vars.get("InputLanguage") or "en"
+SpeechBackend = (env_vars.get("SpeechBackend") or "native").lower()  # "native" or "browser"
+VoskModelPath = env_vars.get("VoskModelPath") or os.path.join("Data", "vosk-model")
+ListenTimeout = float(env_vars.get("ListenTimeout", "10"))  # Seconds without speech before SpeechRecognition returns None
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+current_dir = os.getcwd()
+TempDirPath = rf"{current_dir}\Frontend\Files"
+
+def SetAssistantStatus(Status):
+
+    with open(rf'{TempDirPath}\Status.data', "w", encoding='utf-8') as file:
+        file.write(Status)
+
+def QueryModifier(Query):
+
+    new_query = Query.lower().strip()
+    query_words = new_query.split()
+    question_words = ["how", "what", "who", "where", "when", "why", "which", "whose", "whom","can you","what's","where's","how's", "can you"]
+
+    if any(word + " " in new_query for word in question_words):
+        if query_words[-1][-1] in ['.', '?', '!']:
+            new_query = new_query[:-1] + "?"
+        else:
+            new_query += "?"
+
+    else:
+        if query_words[-1][-1] in ['.', '?', '!']:
+            new_query = new_query[:-1] + "."
+        else:
+            new_query += "."
+
+    return new_query.capitalize()
+
+def UniversalTranslator(Text):
+
+    english_translation = mt.translate(Text, "en", "auto")
+    return english_translation.capitalize()
+
+class ArraySource:
+    """Feeds pre-recorded samples frame by frame, for tests and benchmarks"""
+
+    def __init__(self, samples, frame_samples=FRAME_SAMPLES):
+        self.samples = np.asarray(samples, dtype=np.int16)
+        self.frame_samples = frame_samples
+        self.position = 0
+        self.exhausted = False
+
+    def read_frame(self, timeout=None):
+        if self.position + self.frame_samples > len(self.samples):
+            self.exhausted = True
+            return None
+        frame = self.samples[self.position:self.position + self.frame_samples]
+        self.position += self.frame_samples
+        return frame
+
+class VoskRecognizer:
+    """Offline streaming recognizer backed by a Vosk model directory"""
+
+    def __init__(self, model_path=VoskModelPath, rate=SAMPLE_RATE):
+        if not HAVE_VOSK:
+            raise RuntimeError("vosk is not installed")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)
+        self.rate = rate
+        self.recognizer = None
+        self.finals = []
+
+    def start(self):
+        self.recognizer = vosk.KaldiRecognizer(self.model, self.rate)
+        self.finals = []
+
+    def accept(self, pcm):
+        """Feed one frame and return the transcript so far"""
+        if self.recognizer.AcceptWaveform(pcm.tobytes()):
+            self.finals.append(json.loads(self.recognizer.Result()).get("text", ""))
+            return " ".join(t for t in self.finals if t)
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return " ".join(t for t in self.finals + [partial] if t)
+
+    def finish(self):
+        self.finals.append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        return " ".join(t for t in self.finals if t)
+
+class StubRecognizer:
+    """Deterministic recognizer for tests: one scripted transcript per segment, revealed word by word as audio arrives"""
+
+    def __init__(self, transcripts, words_per_second=3.0, rate=SAMPLE_RATE):
+        self.transcripts = list(transcripts)
+        self.words_per_second = words_per_second
+        self.rate = rate
+        self.index = 0
+        self.text = ""
+        self.samples = 0
+
+    def start(self):
+        self.text = self.transcripts[self.index % len(self.transcripts)]
+        self.index += 1
+        self.samples = 0
+
+    def accept(self, pcm):
+        self.samples += len(pcm)
+        words = self.text.split()
+        return " ".join(words[:int(self.samples / self.rate * self.words_per_second)])
+
+    def finish(self):
+        return self.text
+
+class NativeSpeechPipeline:
+    """Microphone (a capture bus subscription) -> VAD -> streaming recognizer, all in-process"""
+
+    def __init__(self, source=None, recognizer=None, vad=None):
+        self.source = source
+        self.recognizer = recognizer
+        self.vad = vad or VoiceActivityDetector(FRAME_SAMPLES, SAMPLE_RATE)
+        self.lock = threading.Lock()
+        self.frames = 0  # Frames seen by the VAD
+        self.recognizer_frames = 0  # Frames that reached the recognizer
+
+    def _ensure_started(self):
+        if self.recognizer is None:
+            self.recognizer = VoskRecognizer()
+        if self.source is None:
+            self.source = capture_bus.subscribe("speech", SAMPLE_RATE, FRAME_SAMPLES, np.int16)
+        if isinstance(self.source, Subscription):
+            self.source.bus.start()
+
+    def listen(self, timeout=None, on_partial=None):
+        """Return the transcript of the next speech segment, or None if nobody spoke within `timeout` seconds"""
+        with self.lock:
+            self._ensure_started()
+            self.vad.reset()
+            if hasattr(self.source, "clear"):
+                self.source.clear()  # Audio captured while nobody was listening (e.g. our own speech) is stale
+            deadline = time.monotonic() + timeout if timeout else None
+            in_speech = False
+            last_partial = ""
+            segment_samples = 0
+
+            while True:
+                frame = self.source.read_frame(timeout=0.5)
+                if frame is None:
+                    if getattr(self.source, "exhausted", False):
+                        return self.recognizer.finish().strip() or None if in_speech else None
+                    if not in_speech and deadline and time.monotonic() > deadline:
+                        return None
+                    continue
+
+                # The recognizer only runs on segments the VAD opened; silence costs one VAD frame
+                self.frames += 1
+                event = self.vad.process(frame)
+                if not in_speech:
+                    if event == "start":
+                        in_speech = True
+                        self.recognizer.start()
+                        for buffered in self.vad.take_preroll():
+                            last_partial = self.recognizer.accept(buffered)
+                            segment_samples += len(buffered)
+                            self.recognizer_frames += 1
+                    elif deadline and time.monotonic() > deadline:
+                        return None
+                    continue
+
+                partial = self.recognizer.accept(frame)
+                segment_samples += len(frame)
+                self.recognizer_frames += 1
+                if on_partial and partial and partial != last_partial:
+                    on_partial(partial)
+                last_partial = partial
+
+                if event == "end":
+                    finish_started = time.perf_counter()
+                    text = self.recognizer.finish().strip()
+                    print(f"[SpeechToText] Segment of {segment_samples / SAMPLE_RATE:.2f}s audio finalized in "
+                          f"{(time.perf_counter() - finish_started) * 1000:.0f}ms "
+                          f"(recognizer ran on {self.recognizer_frames}/{self.frames} frames so far): {text}")
+                    if text:
+                        return text
+                    in_speech = False
+                    last_partial = ""
+                    segment_samples = 0
+
+    def close(self):
+        if hasattr(self.source, "close"):
+            self.source.close()
+
+_pipeline = None
+
+def get_speech_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = NativeSpeechPipeline()
+    return _pipeline
+
+# Browser fallback (SpeechBackend=browser): webkitSpeechRecognition in headless Chrome, started on first use
 
 HtmlCode = '''<!DOCTYPE html>
 <html lang="en">
@@ -24,8 +233,19 @@ HtmlCode = '''<!DOCTYPE html>
 
     <script>
         const output = document.getElementById('output');
+        const pending = [];
+        let waiter = null;
         let recognition;
 
+        // Resolves with the next result, or null after timeoutMs; Python awaits this over CDP
+        function nextTranscript(timeoutMs) {
+            if (pending.length) return Promise.resolve(pending.shift());
+            return new Promise(resolve => {
+                waiter = resolve;
+                setTimeout(() => { if (waiter === resolve) { waiter = null; resolve(null); } }, timeoutMs);
+            });
+        }
+
         function startRecognition() {
             recognition = new webkitSpeechRecognition() || new SpeechRecognition();
             recognition.lang = '';
@@ -33,7 +253,14 @@ HtmlCode = '''<!DOCTYPE html>
 
             recognition.onresult = function(event) {
                 const transcript = event.results[event.results.length - 1][0].transcript;
-                output.textContent += transcript;
+                output.textContent = transcript;
+                if (waiter) {
+                    const resolve = waiter;
+                    waiter = null;
+                    resolve(transcript);
+                } else {
+                    pending.push(transcript);
+                }
             };
 
             recognition.onend = function() {
@@ -53,134 +280,261 @@ HtmlCode = '''<!DOCTYPE html>
 
 HtmlCode = str(HtmlCode).replace("recognition.lang = '';",f"recognition.lang = '{InputLanguage}';")
 
-with open(r"Data\Voice.html","w") as f:
-      f.write(HtmlCode)
-
-current_dir = os.getcwd()
 Link = f"{current_dir}\Data\Voice.html"
-chrome_options = Options()
-user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.142.86 Safari/537.36"
-chrome_options.add_argument(f'user-agent={user_agent}')
-chrome_options.add_argument("--use-fake-ui-for-media-stream")
-chrome_options.add_argument("--use-fake-device-for-media-stream")
-chrome_options.add_argument("--headless=new")
-service = Service(ChromeDriverManager().install())
 driver = None
+_browser = None
+
+def _init_browser():
+    """Import Selenium and prepare the Chrome options and service on first use"""
+    global _browser
+    if _browser is None:
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        with open(r"Data\Voice.html","w") as f:
+              f.write(HtmlCode)
+
+        chrome_options = Options()
+        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.142.86 Safari/537.36"
+        chrome_options.add_argument(f'user-agent={user_agent}')
+        chrome_options.add_argument("--use-fake-ui-for-media-stream")
+        chrome_options.add_argument("--use-fake-device-for-media-stream")
+        chrome_options.add_argument("--headless=new")
+        _browser = {"webdriver": webdriver, "By": By, "options": chrome_options,
+                    "service": Service(ChromeDriverManager().install())}
+    return _browser
 
 def initialize_driver():
     """Initialize or reinitialize the Chrome driver"""
     global driver
     try:
+        browser = _init_browser()
         if driver:
             try:
                 driver.quit()
             except:
                 pass
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = browser["webdriver"].Chrome(service=browser["service"], options=browser["options"])
         print("[SpeechToText] Chrome driver initialized successfully")
         return True
     except Exception as e:
         print(f"[SpeechToText] Error initializing Chrome driver: {e}")
         return False
 
-# Initialize driver on module load
-initialize_driver()
-
-TempDirPath = rf"{current_dir}\Frontend\Files"
+class TranscriptBridge:
+    """Delivers page results without polling: a thread blocks on the page's next result and queues it"""
 
-def SetAssistantStatus(Status):
-      
-    with open(rf'{TempDirPath}\Status.data', "w", encoding='utf-8') as file:
-        file.write(Status)
+    def __init__(self, await_transcript, reconnect=None, wait_ms=5000):
+        self.await_transcript = await_transcript  # callable(timeout_ms) -> transcript or None
+        self.reconnect = reconnect  # callable() -> bool, run after the page or driver went away
+        self.wait_ms = wait_ms
+        self.transcripts = queue.Queue()
+        self.listening = threading.Event()
+        self.running = False
+        self.thread = None
 
-def QueryModifier(Query):
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
 
-    new_query = Query.lower().strip()
-    query_words = new_query.split()
-    question_words = ["how", "what", "who", "where", "when", "why", "which", "whose", "whom","can you","what's","where's","how's", "can you"]
+    def _run(self):
+        while self.running:
+            try:
+                text = self.await_transcript(self.wait_ms)
+            except Exception as e:
+                print(f"[SpeechToText] Transcript bridge error: {e}")
+                if not (self.reconnect and self.reconnect()):
+                    time.sleep(1)
+                continue
+            # Results heard while nobody is listening (e.g. during TTS) are dropped, as before
+            if text and self.listening.is_set():
+                self.transcripts.put(text)
 
-    if any(word + " " in new_query for word in question_words):
-        if query_words[-1][-1] in ['.', '?', '!']:
-            new_query = new_query[:-1] + "?"
-        else:
-            new_query += "?"
+    def next(self, timeout=None):
+        """Block until the page reports a result; None on timeout"""
+        self.listening.set()
+        try:
+            return self.transcripts.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        finally:
+            self.listening.clear()
 
-    else:
-        if query_words[-1][-1] in ['.', '?', '!']:
-            new_query = new_query[:-1] + "."
-        else:
-            new_query += "."
+    def stop(self):
+        self.running = False
 
-    return new_query.capitalize()
+_bridge = None
 
-def UniversalTranslator(Text):
+def _load_page():
+    driver.get("file:///" + Link)
+    driver.find_element(by=_browser["By"].ID,value="start").click()
 
-    english_translation = mt.translate(Text, "en", "auto")
-    return english_translation.capitalize()
+def _await_page_transcript(timeout_ms):
+    """Block inside Chrome until the page's next onresult (or timeout_ms) via CDP awaitPromise"""
+    result = driver.execute_cdp_cmd("Runtime.evaluate", {
+        "expression": f"nextTranscript({int(timeout_ms)})", "awaitPromise": True, "returnByValue": True})
+    return result.get("result", {}).get("value")
 
-def SpeechRecognition():
-    global driver
-    
-    # Check if driver is still valid, if not reinitialize
+def _restart_browser():
+    """Reload the page, or restart Chrome if the driver itself is gone"""
     try:
         driver.current_url
-    except:
-        print("[SpeechToText] Chrome driver disconnected, reinitializing...")
+    except Exception:
+        print("[SpeechToText] Chrome disconnected, reinitializing driver...")
         if not initialize_driver():
-            return None
-    
+            return False
     try:
-        driver.get("file:///" + Link)
-        driver.find_element(by=By.ID,value="start").click()
+        _load_page()
+        return True
     except Exception as e:
-        if "disconnected" in str(e) or "chrome not reachable" in str(e):
-            print("[SpeechToText] Chrome disconnected during setup, reinitializing...")
-            if not initialize_driver():
-                return None
-            try:
-                driver.get("file:///" + Link)
-                driver.find_element(by=By.ID,value="start").click()
-            except Exception as e2:
-                print(f"[SpeechToText] Failed to reinitialize: {e2}")
-                return None
-        else:
+        print(f"[SpeechToText] Failed to restart after reinitialization: {e}")
+        return False
+
+def BrowserSpeechRecognition():
+    global _bridge
+
+    if _bridge is None:
+        if not initialize_driver():
+            return None
+        try:
+            _load_page()
+        except Exception as e:
             print(f"[SpeechToText] Error setting up speech recognition: {e}")
             return None
+        _bridge = TranscriptBridge(_await_page_transcript, _restart_browser)
+        _bridge.start()
+
+    return _bridge.next(timeout=ListenTimeout)
 
-    while True:
+def uses_capture_bus():
+    """True while the native pipeline (shared, echo-cancelled capture bus) is the active recognizer"""
+    return SpeechBackend != "browser"
+
+def SpeechRecognition(on_partial=None):
+    """Listen for one utterance and return it as a cleaned-up query (None if nothing was heard)
+
+    on_partial(text) is called with the growing transcript while the user is still speaking."""
+    global SpeechBackend
+
+    Text = None
+    if SpeechBackend != "browser":
         try:
-            Text = driver.find_element(by=By.ID,value="output").text
+            Text = get_speech_pipeline().listen(timeout=ListenTimeout, on_partial=on_partial)
+        except (RuntimeError, OSError) as e:
+            print(f"[SpeechToText] Native recognition unavailable ({e}), falling back to the browser recognizer")
+            SpeechBackend = "browser"
+    if SpeechBackend == "browser":
+        Text = BrowserSpeechRecognition()
+
+    if not Text:
+        return None
+    if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
+        return QueryModifier(Text)
+    else:
+        SetAssistantStatus("Translating...")
+        return QueryModifier(UniversalTranslator(Text))
 
-            if Text:
-                driver.find_element(by=By.ID,value="end").click()
-                if InputLanguage.lower() == "en" or "en" in InputLanguage.lower():
-                    return QueryModifier(Text)
-                else:
-                    SetAssistantStatus("Translating...")
-                    return QueryModifier(UniversalTranslator(Text))
+def _synthetic_utterances(count, speech_seconds=1.5, silence_seconds=1.0, rate=SAMPLE_RATE):
+    """Silence / tone-burst pairs standing in for recorded speech"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(speech_seconds * rate)) / rate
+    pieces = []
+    for _ in range(count):
+        pieces.append(rng.normal(0, 50, int(silence_seconds * rate)))
+        pieces.append(3000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 50, len(t)))
+    pieces.append(rng.normal(0, 50, int(silence_seconds * rate)))
+    return np.concatenate(pieces).astype(np.int16)
 
-        except Exception as e:
-            if "disconnected: not connected to DevTools" in str(e) or "chrome not reachable" in str(e) or "disconnected: unable to send message to renderer" in str(e):
-                print("[SpeechToText] Chrome disconnected, reinitializing driver...")
-                if initialize_driver():
-                    # Restart the speech recognition process
-                    try:
-                        driver.get("file:///" + Link)
-                        driver.find_element(by=By.ID,value="start").click()
-                        continue  # Continue the loop with the new driver
-                    except Exception as e2:
-                        print(f"[SpeechToText] Failed to restart after reinitialization: {e2}")
-                        return None
-                else:
-                    print("[SpeechToText] Failed to reinitialize Chrome driver")
-                    return None
-            # For other errors, just continue trying
-            pass
+class _SimulatedRecognitionPage:
+    """Stands in for Voice.html in the benchmark: emits results and exposes both the awaitable and the DOM text"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = deque()
+        self.output = ""
+        self.emitted = {}
+
+    def emit(self, text):
+        with self.cond:
+            self.emitted[text] = time.perf_counter()
+            self.pending.append(text)
+            self.output = text
+            self.cond.notify_all()
+
+    def await_transcript(self, timeout_ms):
+        with self.cond:
+            self.cond.wait_for(lambda: self.pending, timeout_ms / 1000)
+            return self.pending.popleft() if self.pending else None
+
+    def read_output(self):
+        with self.cond:
+            text, self.output = self.output, ""
+            return text
+
+def benchmark_transcript_delivery(count=20, interval=0.25):
+    """Result-to-return latency and listen-loop CPU of the event bridge versus the old DOM polling loop"""
+
+    def run(receive):
+        page = _SimulatedRecognitionPage()
+        latencies = []
+
+        def emitter():
+            for i in range(count):
+                time.sleep(interval)
+                page.emit(f"result {i}")
+
+        next_result = receive(page)
+        thread = threading.Thread(target=emitter, daemon=True)
+        wall, cpu = time.perf_counter(), time.process_time()
+        thread.start()
+        for _ in range(count):
+            text = next_result()
+            latencies.append((time.perf_counter() - page.emitted[text]) * 1000)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        latencies.sort()
+        return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1], 100 * cpu / wall
+
+    def event_bridge(page):
+        bridge = TranscriptBridge(page.await_transcript)
+        bridge.start()
+        return lambda: bridge.next(timeout=5)
+
+    def dom_polling(page):
+        def poll():
+            while True:  # The old loop: read the DOM until it has text, no sleep
+                text = page.read_output()
+                if text:
+                    return text
+        return poll
+
+    results = {}
+    for name, receive in (("event bridge", event_bridge), ("DOM polling", dom_polling)):
+        median, p95, cpu = run(receive)
+        results[name] = {"median_ms": median, "p95_ms": p95, "cpu_percent": cpu}
+        print(f"[SpeechToText] {name}: result-to-return median {median:.3f}ms, p95 {p95:.3f}ms, CPU {cpu:.0f}% of one core")
+    print("[SpeechToText] In Chrome every poll is also a WebDriver HTTP round trip, so real polling costs more")
+    return results
 
 if __name__ == "__main__":
-      
-    while True:
-        
-        Text = SpeechRecognition()
-        print(Text)
 
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_transcript_delivery()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--stub":
+        # Offline check of the pipeline with synthetic audio and the scripted recognizer
+        script = ["what is the weather today", "open notepad", "wake up jarvis"]
+        pipeline = NativeSpeechPipeline(ArraySource(_synthetic_utterances(len(script))), StubRecognizer(script))
+        while True:
+            Text = pipeline.listen(on_partial=lambda text: print(f"  partial: {text}"))
+            if Text is None:
+                break
+            print(QueryModifier(Text))
+    else:
+        while True:
+
+            Text = SpeechRecognition()
+            print(Text)
@@ -1,52 +1,198 @@
-import pygame
 import random
 import asyncio
 import edge_tts
 import os
+import sys
+import io
+import wave
 import threading
 import time
+import queue
+import re
 from dotenv import dotenv_values
-import uuid
+from Backend.AudioPlayer import audio_player
+from Backend.AudioCache import AudioCache, CachedSynthesizer
 
 # Global flag for TTS interruption
 TTS_PLAYING = False
 TTS_STOP_FLAG = False
 
+# Pipeline: QueueSpeech -> _text_queue -> synthesis thread -> _audio_queue -> playback thread.
+# Every item is tagged with the generation it was queued in; stop_tts() bumps the
+# generation so both stages drop anything queued before the stop.
+AUDIO_QUEUE_SIZE = 2  # Sentences synthesized ahead of the one playing
+_text_queue = queue.Queue()
+_audio_queue = queue.Queue(maxsize=AUDIO_QUEUE_SIZE)
+_speech_generation = 0
+_workers_started = False
+_worker_lock = threading.Lock()
+_playback_lock = threading.Lock()  # Orders stop_tts() against a sentence starting to play
+_synth_loop = None
+_synth_task = None
+_synth_busy = False
+_utterance_started = None
+_first_audio_event = threading.Event()
+
 env_vars = dotenv_values(".env")
 AssistantVoice = env_vars.get("AssistantVoice", "en-CA-LiamNeural")
+TTSCacheMB = int(env_vars.get("TTSCacheMB", "50"))
+
+class EdgeTTSSynthesizer:
+    """Synthesizes a sentence with edge-tts and returns the mp3 bytes"""
+
+    format = "mp3"
+
+    def __init__(self, voice=AssistantVoice):
+        self.voice = voice
+
+    async def synthesize(self, text):
+        audio = bytearray()
+        async for chunk in edge_tts.Communicate(text, self.voice).stream():
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+        return bytes(audio)
+
+class StandInSynthesizer:
+    """Offline stand-in for tests and benchmarks: silent WAV audio after a length-proportional delay"""
+
+    format = "wav"
+
+    def __init__(self, latency=0.1, synth_seconds_per_char=0.004, seconds_per_char=0.06, rate=16000):
+        self.latency = latency
+        self.synth_seconds_per_char = synth_seconds_per_char
+        self.seconds_per_char = seconds_per_char
+        self.rate = rate
+
+    async def synthesize(self, text):
+        await asyncio.sleep(self.latency + len(text) * self.synth_seconds_per_char)
+        frames = int(len(text) * self.seconds_per_char * self.rate)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.rate)
+            wav.writeframes(b"\x00\x00" * frames)
+        return buffer.getvalue()
+
+# Phrases rendered once are replayed from Data/TTSCache instead of going back to edge-tts
+tts_cache = AudioCache(max_bytes=TTSCacheMB * 1024 * 1024)
+_synthesizer = CachedSynthesizer(EdgeTTSSynthesizer(), tts_cache)
+
+def set_synthesizer(synthesizer):
+    """Swap the synthesis backend (anything with an async synthesize(text) -> bytes and a format)"""
+    global _synthesizer
+    _synthesizer = synthesizer
+
+# A sentence ends at . ! or ? (plus closing quotes/brackets) followed by whitespace, or at a line break
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+class SentenceSplitter:
+    """Accumulates streamed text deltas and hands back each sentence once it is complete"""
+
+    def __init__(self, min_chars=20):
+        self.min_chars = min_chars  # Shorter sentences are merged with the next one
+        self.buffer = ""
+
+    def feed(self, delta):
+        """Add a text delta and return the sentences it completed"""
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            sentence = self.buffer[start:match.end()].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended"""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+def split_sentences(text, min_chars=20):
+    """Split a complete text into sentences the same way a stream would be split"""
+    splitter = SentenceSplitter(min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+def _drain(q):
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
 
 def stop_tts():
-    """Stop the currently playing TTS"""
-    global TTS_STOP_FLAG, TTS_PLAYING
+    """Stop the currently playing TTS and cancel queued and in-flight synthesis"""
+    global TTS_STOP_FLAG, TTS_PLAYING, _speech_generation, _utterance_started
+    with _playback_lock:
+        _speech_generation += 1
+        audio_player.stop()
     TTS_STOP_FLAG = True
     TTS_PLAYING = False
+    _utterance_started = None
+    _drain(_text_queue)
+    _drain(_audio_queue)
+    task, loop = _synth_task, _synth_loop
+    if task is not None and loop is not None:
+        loop.call_soon_threadsafe(task.cancel)
     print("[TTS] Stopping speech...")
 
 def is_tts_playing():
-    """Check if TTS is currently playing"""
-    return TTS_PLAYING
+    """Check if TTS is currently playing or has sentences in the pipeline"""
+    return TTS_PLAYING or _synth_busy or not _text_queue.empty() or not _audio_queue.empty()
 
-async def _tts_async(text):
-    global TTS_PLAYING, TTS_STOP_FLAG
-    TTS_PLAYING = True
-    TTS_STOP_FLAG = False
-    unique_id = str(uuid.uuid4())
-    tts_file = f"Data/speech_{unique_id}.mp3"
+def _synthesis_worker():
+    """Producer: synthesize queued sentences while earlier ones are still playing"""
+    global _synth_loop, _synth_task, _synth_busy
+    _synth_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_synth_loop)
+    while True:
+        generation, text = _text_queue.get()
+        if generation != _speech_generation:
+            continue
+        _synth_busy = True
+        try:
+            print(f"[TTS] Generating speech for: {text[:50]}...")
+            synthesizer = _synthesizer
+            _synth_task = _synth_loop.create_task(synthesizer.synthesize(text))
+            audio = _synth_loop.run_until_complete(_synth_task)
+        except asyncio.CancelledError:
+            continue
+        except Exception as e:
+            print(f"[TTS] Synthesis error: {e}")
+            continue
+        finally:
+            _synth_task = None
+            _synth_busy = False
+        # Bounded hand-off: wait for room unless the sentence was cancelled meanwhile
+        while generation == _speech_generation:
+            try:
+                _audio_queue.put((generation, audio, synthesizer.format), timeout=0.05)
+                break
+            except queue.Full:
+                pass
+
+def _play_audio(generation, audio, fmt):
+    """Play one synthesized sentence from memory on the shared audio device"""
+    global TTS_PLAYING, _utterance_started
     try:
-        print(f"[TTS] Generating speech for: {text[:50]}...")
-        communicate = edge_tts.Communicate(text, AssistantVoice)
-        await communicate.save(tts_file)
-        if TTS_STOP_FLAG:
-            print("[TTS] Speech interrupted before playing")
-            return
+        # A sentence dequeued just before stop_tts() must not start after it
+        with _playback_lock:
+            if generation != _speech_generation:
+                return
+            TTS_PLAYING = True
+            audio_player.start(audio, fmt)
+        if _utterance_started is not None:
+            print(f"[TTS] Time to first audio: {time.perf_counter() - _utterance_started:.2f}s")
+            _utterance_started = None
+        _first_audio_event.set()
         print("[TTS] Playing speech...")
-        pygame.mixer.init()
-        pygame.mixer.music.load(tts_file)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy() and not TTS_STOP_FLAG:
-            time.sleep(0.1)
-        if TTS_STOP_FLAG:
-            pygame.mixer.music.stop()
+        # stop_tts() stops the player, which wakes this wait immediately
+        completed = audio_player.wait()
+        if not completed or generation != _speech_generation:
+            audio_player.stop()
             print("[TTS] Speech interrupted during playback")
         else:
             print("[TTS] Speech completed successfully")
@@ -54,48 +200,93 @@ async def _tts_async(text):
         print(f"[TTS] Error: {e}")
     finally:
         TTS_PLAYING = False
-        try:
-            pygame.mixer.quit()
-        except Exception:
-            pass
-        # Clean up the TTS file
-        try:
-            if os.path.exists(tts_file):
-                os.remove(tts_file)
-        except Exception as cleanup_err:
-            print(f"[TTS] Cleanup error: {cleanup_err}")
+
+def _playback_worker():
+    """Consumer: play synthesized sentences in order"""
+    while True:
+        generation, audio, fmt = _audio_queue.get()
+        if generation == _speech_generation:
+            _play_audio(generation, audio, fmt)
+
+def _ensure_workers():
+    global _workers_started
+    with _worker_lock:
+        if not _workers_started:
+            threading.Thread(target=_synthesis_worker, daemon=True).start()
+            threading.Thread(target=_playback_worker, daemon=True).start()
+            _workers_started = True
+
+def QueueSpeech(text):
+    """Speak text after everything already queued, e.g. sentences of a streamed answer"""
+    global TTS_STOP_FLAG, _utterance_started
+    _ensure_workers()
+    if not is_tts_playing():
+        _utterance_started = time.perf_counter()
+    TTS_STOP_FLAG = False
+    _text_queue.put((_speech_generation, text))
 
 def TextToSpeech(text):
     """Convert text to speech with interruption capability"""
-    global TTS_PLAYING, TTS_STOP_FLAG
-    
-    # Stop any currently playing speech
-    if TTS_PLAYING:
+
+    # Stop any currently playing speech; playback stops synchronously, so the new speech can follow at once
+    if is_tts_playing():
         stop_tts()
-        time.sleep(0.5)  # Brief pause to ensure clean stop
-    
-    # Start new speech in a separate thread
-    def run_tts():
-        asyncio.run(_tts_async(text))
-    
-    tts_thread = threading.Thread(target=run_tts)
-    tts_thread.daemon = True
-    tts_thread.start()
-    
+
+    # Synthesis of sentence N+1 overlaps playback of sentence N
+    for sentence in split_sentences(text):
+        QueueSpeech(sentence)
+
     print(f"[TTS] Started speaking: {text[:50]}...")
 
+def prewarm_tts_cache(phrases, concurrency=4):
+    """Render fixed phrases into the cache in the background, split the same way TextToSpeech splits them"""
+    synthesizer = _synthesizer
+    if not isinstance(synthesizer, CachedSynthesizer):
+        return None
+    sentences = list(dict.fromkeys(s for phrase in phrases for s in split_sentences(phrase)))
+    missing = [s for s in sentences if not synthesizer.is_cached(s)]
+    if not missing:
+        print(f"[TTS] Cache prewarm: all {len(sentences)} phrases already cached")
+        return None
+
+    async def render_all():
+        limit = asyncio.Semaphore(concurrency)
+        async def render(sentence):
+            async with limit:
+                try:
+                    await synthesizer.synthesize(sentence)
+                except Exception as e:
+                    print(f"[TTS] Cache prewarm failed for '{sentence[:30]}...': {e}")
+        await asyncio.gather(*(render(s) for s in missing))
+
+    def worker():
+        started = time.perf_counter()
+        asyncio.run(render_all())
+        print(f"[TTS] Cache prewarm: rendered {len(missing)} of {len(sentences)} phrases in {time.perf_counter() - started:.1f}s")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+def shutdown_tts():
+    """Stop speech, persist the phrase cache and release the audio device at application exit"""
+    stop_tts()
+    tts_cache.flush()
+    print(f"[TTS] Phrase cache: {tts_cache.stats()}")
+    audio_player.shutdown()
+
 def check_for_interruption(audio_text):
     """Check if the audio text contains interruption keywords"""
     # Only interrupt if it's a clear wake word or stop command
     # Don't interrupt if "jarvis" is part of a normal question
     audio_lower = audio_text.lower().strip()
-    
+
     # Clear interruption commands
     if audio_lower in ['stop', 'halt', 'pause', 'shut up']:
         print(f"[TTS] Interruption keyword detected: {audio_lower}")
         stop_tts()
         return True
-    
+
     # Wake word detection - only if it's a standalone "jarvis" or starts with "jarvis"
     if audio_lower == 'jarvis' or audio_lower.startswith('jarvis '):
         # Check if it's just "jarvis" or "jarvis" followed by a command
@@ -103,7 +294,7 @@ def check_for_interruption(audio_text):
             print(f"[TTS] Wake word detected: {audio_lower}")
             stop_tts()
             return True
-    
+
     # Don't interrupt for normal conversation like "how are you jarvis?"
     return False
 
@@ -111,7 +302,35 @@ def TTS(Text, func=lambda r=None: True):
     """Legacy TTS function for compatibility"""
     TextToSpeech(Text)
 
-if __name__ == "__main__":  
-    while True:
-        TextToSpeech(input("Enter the text : "))
+def benchmark_time_to_first_audio(text, synthesizer=None, timeout=60):
+    """Compare time-to-first-audio of the sentence pipeline with synthesizing the whole text first"""
+    synthesizer = synthesizer or _synthesizer
+
+    started = time.perf_counter()
+    asyncio.run(synthesizer.synthesize(text))
+    whole_text = time.perf_counter() - started
+
+    previous = _synthesizer
+    set_synthesizer(synthesizer)
+    try:
+        _first_audio_event.clear()
+        started = time.perf_counter()
+        TextToSpeech(text)
+        _first_audio_event.wait(timeout)
+        pipelined = time.perf_counter() - started
+    finally:
+        stop_tts()
+        set_synthesizer(previous)
+
+    print(f"[TTS] Time to first audio: whole text {whole_text:.2f}s, sentence pipeline {pipelined:.2f}s "
+          f"({len(split_sentences(text))} sentences)")
+    return {"whole_text": whole_text, "pipelined": pipelined}
 
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        sample = " ".join(f"This is sentence number {i} of a long search answer." for i in range(12))
+        benchmark_time_to_first_audio(sample, StandInSynthesizer())
+    else:
+        while True:
+            TextToSpeech(input("Enter the text : "))
@@ -0,0 +1,196 @@
+import sys
+import time
+import numpy as np
+from collections import deque
+
+class VoiceActivityDetector:
+    """Adaptive energy/spectral VAD over fixed-size frames from the capture bus
+
+    A frame counts as voice when its energy clears the tracked noise floor by `snr_db` and most of its power sits
+    in the voice band. A segment opens after `start_frames` voiced frames and closes after `hangover_frames`
+    unvoiced ones; the last `preroll_frames` before the trigger are kept so the recognizer hears the onset.
+
+    Steady noise in the voice band (fans, air conditioning) looks voiced, so the floor also follows the minimum
+    energy of the last second while frames are voiced: speech dips between syllables and keeps that minimum low,
+    stationary noise does not. A segment cut at `max_segment_frames` re-estimates the floor from its quietest frame."""
+
+    def __init__(self, frame_samples=480, rate=16000, snr_db=9.0, min_energy_db=-60.0, voice_band=(100.0, 4000.0),
+                 min_voice_ratio=0.6, start_frames=3, hangover_frames=15, preroll_frames=10, max_segment_seconds=15.0):
+        self.frame_samples = frame_samples
+        self.rate = rate
+        self.snr_db = snr_db
+        self.min_energy_db = min_energy_db
+        self.min_voice_ratio = min_voice_ratio
+        self.start_frames = start_frames
+        self.hangover_frames = hangover_frames
+        self.preroll_frames = preroll_frames
+        self.max_segment_frames = int(max_segment_seconds * rate / frame_samples)
+        self.recent_energy = deque(maxlen=max(1, rate // frame_samples))  # About one second of frame energies
+        self.segment_min_db = None
+
+        self.window = np.hanning(frame_samples).astype(np.float32)
+        self.samples = np.empty(frame_samples, dtype=np.float32)
+        self.power = np.empty(frame_samples // 2 + 1, dtype=np.float64)
+        bin_hz = rate / frame_samples
+        self.voice_bins = slice(int(voice_band[0] / bin_hz), int(np.ceil(voice_band[1] / bin_hz)) + 1)
+
+        self.noise_floor_db = None
+        self.preroll = deque(maxlen=preroll_frames + start_frames)
+        self.frames = 0
+        self.voiced_frames = 0
+        self.segments = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the current segment (the noise floor is kept)"""
+        self.in_speech = False
+        self.run = 0
+        self.quiet = 0
+        self.segment_frames = 0
+        self.segment_min_db = None
+        self.preroll.clear()
+
+    def _features(self, frame):
+        """Frame energy in dBFS and the fraction of its power inside the voice band"""
+        if frame.dtype == np.int16:
+            np.multiply(frame, 1.0 / 32768, out=self.samples)
+        else:
+            self.samples[:] = frame
+        energy_db = 10 * np.log10(np.dot(self.samples, self.samples) / len(self.samples) + 1e-12)
+        np.multiply(self.samples, self.window, out=self.samples)
+        np.abs(np.fft.rfft(self.samples), out=self.power)
+        np.square(self.power, out=self.power)
+        total = self.power.sum()
+        voice_ratio = self.power[self.voice_bins].sum() / total if total > 0 else 0.0
+        return float(energy_db), float(voice_ratio)
+
+    def _track_floor(self, energy_db):
+        # Falls quickly to quieter frames, rises slowly so speech does not drag it up
+        if self.noise_floor_db is None:
+            self.noise_floor_db = energy_db
+        elif energy_db < self.noise_floor_db:
+            self.noise_floor_db += 0.3 * (energy_db - self.noise_floor_db)
+        else:
+            self.noise_floor_db += 0.02 * (energy_db - self.noise_floor_db)
+
+    def is_voice(self, frame):
+        energy_db, voice_ratio = self._features(frame)
+        threshold = max(self.min_energy_db, (self.noise_floor_db if self.noise_floor_db is not None else energy_db) + self.snr_db)
+        voiced = energy_db >= threshold and voice_ratio >= self.min_voice_ratio
+        self.recent_energy.append(energy_db)
+        if self.in_speech:
+            self.segment_min_db = energy_db if self.segment_min_db is None else min(self.segment_min_db, energy_db)
+        if not voiced:
+            self._track_floor(energy_db)
+        elif self.noise_floor_db is not None:
+            # Creep toward the recent minimum so a constant voice-band noise is absorbed within seconds
+            recent_min = min(self.recent_energy)
+            if recent_min > self.noise_floor_db:
+                self.noise_floor_db += 0.01 * (recent_min - self.noise_floor_db)
+        return voiced
+
+    def process(self, frame):
+        """Return "start", "end" or None for one frame"""
+        self.frames += 1
+        voiced = self.is_voice(frame)
+        self.voiced_frames += voiced
+
+        if not self.in_speech:
+            self.preroll.append(frame)
+            self.run = self.run + 1 if voiced else 0
+            if self.run >= self.start_frames:
+                self.in_speech = True
+                self.quiet = 0
+                self.segment_frames = len(self.preroll)
+                self.segments += 1
+                return "start"
+            return None
+
+        self.segment_frames += 1
+        self.quiet = 0 if voiced else self.quiet + 1
+        if self.quiet >= self.hangover_frames or self.segment_frames >= self.max_segment_frames:
+            if self.segment_frames >= self.max_segment_frames and self.segment_min_db is not None:
+                # Minimum statistics: nobody talks 15 s without a pause, so the quietest frame is the noise
+                self.noise_floor_db = max(self.noise_floor_db, self.segment_min_db)
+            print(f"[VoiceActivity] Segment {self.segments}: {self.segment_frames * self.frame_samples / self.rate:.2f}s "
+                  f"of audio, noise floor {self.noise_floor_db:.0f} dBFS")
+            self.reset()
+            return "end"
+        return None
+
+    def take_preroll(self):
+        """Frames buffered before (and including) the trigger, oldest first"""
+        frames = list(self.preroll)
+        self.preroll.clear()
+        return frames
+
+    def stats(self):
+        return {"frames": self.frames, "voiced_frames": self.voiced_frames, "segments": self.segments,
+                "noise_floor_db": self.noise_floor_db}
+
+def _test_signal(rate=16000):
+    """Quiet room, louder fan noise, then two spoken-like bursts over the fan"""
+    rng = np.random.default_rng(1)
+    def noise(seconds, level):
+        return rng.normal(0, level, int(seconds * rate))
+    def voice(seconds, level):
+        t = np.arange(int(seconds * rate)) / rate
+        return level * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 720 * t) + 0.3 * np.sin(2 * np.pi * 1500 * t))
+    fan = noise(2.0, 300)
+    pieces = [noise(1.0, 30), fan, voice(1.2, 2500) + noise(1.2, 300), noise(1.0, 300),
+              voice(0.8, 2500) + noise(0.8, 300), noise(1.0, 300)]
+    return np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+
+def _fan_signal(rate=16000, seconds=20.0, level_db=-30.0):
+    """A quiet room, then steady 150-1000 Hz noise (fan/AC) switching on, with one spoken-like burst near the end"""
+    rng = np.random.default_rng(2)
+    count = int(seconds * rate)
+    spectrum = np.fft.rfft(rng.normal(0, 1, count))
+    freqs = np.fft.rfftfreq(count, 1 / rate)
+    spectrum[(freqs < 150) | (freqs > 1000)] = 0
+    fan = np.fft.irfft(spectrum, count)
+    fan *= 32768 * 10 ** (level_db / 20) / np.sqrt(np.mean(fan * fan))
+    fan[:2 * rate] = rng.normal(0, 30, 2 * rate)
+    t = np.arange(int(1.0 * rate)) / rate
+    start = int((seconds - 3) * rate)
+    fan[start:start + len(t)] += 6000 * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 720 * t)) * (np.sin(2 * np.pi * 3 * t) > -0.5)
+    return np.clip(fan, -32768, 32767).astype(np.int16)
+
+def _run_vad(signal, frame_samples, rate):
+    vad = VoiceActivityDetector(frame_samples, rate)
+    events = []
+    started = time.perf_counter()
+    for i in range(0, len(signal) - frame_samples + 1, frame_samples):
+        event = vad.process(signal[i:i + frame_samples])
+        if event:
+            events.append((event, round(i / rate, 2)))
+    return vad, events, (time.perf_counter() - started) / vad.frames
+
+def benchmark_vad(frame_samples=480, rate=16000):
+    """Run the detector over synthetic recordings and report segments and per-frame cost"""
+    vad, events, per_frame = _run_vad(_test_signal(rate), frame_samples, rate)
+    print(f"[VoiceActivity] Events: {events}")
+    print(f"[VoiceActivity] {vad.stats()}, {per_frame * 1e6:.1f} us per {frame_samples * 1000 // rate} ms frame")
+
+    fan, fan_events, _ = _run_vad(_fan_signal(rate), frame_samples, rate)
+    print(f"[VoiceActivity] Voice-band fan at -30 dBFS from 2 s, speech at 17-18 s: {fan_events}")
+    print(f"[VoiceActivity] {fan.voiced_frames}/{fan.frames} frames voiced, noise floor {fan.noise_floor_db:.0f} dBFS")
+    return events
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_vad()
+    else:
+        from Backend.AudioCapture import capture_bus
+        subscription = capture_bus.subscribe("vad", 16000, 480, np.int16)
+        capture_bus.start()
+        vad = VoiceActivityDetector()
+        try:
+            while True:
+                frame = subscription.read_frame(timeout=1)
+                if frame is not None:
+                    event = vad.process(frame)
+                    if event:
+                        print(event)
+        except KeyboardInterrupt:
+            capture_bus.stop()
@@ -1,45 +1,101 @@
-import pyaudio
 import numpy as np
 import threading
 import time
 import queue
+import sys
+from collections import namedtuple
+from Backend.AudioCapture import capture_bus
+
+# Compact per-chunk features for the GUI: levels are 0-1, bands are log-spaced from low to high frequency
+AudioFeatures = namedtuple("AudioFeatures", "rms peak zcr bands")
+
+class AudioFeatureExtractor:
+    """RMS, peak, zero-crossing rate and an N-band log spectrum per chunk, computed in preallocated buffers"""
+    
+    def __init__(self, chunk_size=512, rate=16000, n_bands=20, min_freq=80.0, max_freq=8000.0, floor_db=-80.0):
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.n_bands = n_bands
+        self.floor_db = floor_db
+        self.window = np.hanning(chunk_size).astype(np.float32)
+        self.window_gain = float(np.sum(self.window))
+        self.windowed = np.empty(chunk_size, dtype=np.float32)
+        self.power = np.empty(chunk_size // 2 + 1, dtype=np.float64)
+        self.bands = np.empty(n_bands, dtype=np.float64)
+        self.signs = np.empty(chunk_size, dtype=bool)
+        self.crossings = np.empty(chunk_size - 1, dtype=bool)
+        
+        # Log-spaced band edges as rFFT bin indices, at least one bin per band
+        max_freq = min(max_freq, rate / 2)
+        edges = np.geomspace(min_freq, max_freq, n_bands + 1) * chunk_size / rate
+        starts = np.floor(edges[:-1]).astype(np.int64)
+        for i in range(1, n_bands):
+            starts[i] = max(starts[i], starts[i - 1] + 1)
+        self.band_starts = starts
+        self.band_stop = max(int(np.ceil(edges[-1])), starts[-1] + 1)
+        self.band_widths = np.diff(np.append(starts, self.band_stop)).astype(np.float64)
+    
+    def extract(self, frame):
+        """Features of one float32 chunk in [-1, 1]"""
+        n = len(frame)
+        rms = float(np.sqrt(np.dot(frame, frame) / n))
+        peak = float(max(frame.max(), -frame.min()))
+        np.signbit(frame, out=self.signs)
+        np.not_equal(self.signs[1:], self.signs[:-1], out=self.crossings)
+        zcr = float(np.count_nonzero(self.crossings)) / (n - 1)
+        
+        # Band power: mean |X|^2 over each band's bins, in dB relative to a full-scale sine, mapped to 0-1
+        np.multiply(frame, self.window, out=self.windowed)
+        spectrum = np.fft.rfft(self.windowed)
+        np.abs(spectrum, out=self.power)
+        np.multiply(self.power, 2.0 / self.window_gain, out=self.power)
+        np.square(self.power, out=self.power)
+        np.add.reduceat(self.power[:self.band_stop], self.band_starts, out=self.bands)
+        np.divide(self.bands, self.band_widths, out=self.bands)
+        np.add(self.bands, 1e-12, out=self.bands)
+        np.log10(self.bands, out=self.bands)
+        np.multiply(self.bands, 10.0 / -self.floor_db, out=self.bands)
+        np.add(self.bands, 1.0, out=self.bands)
+        np.clip(self.bands, 0.0, 1.0, out=self.bands)
+        return AudioFeatures(rms, peak, zcr, tuple(self.bands.tolist()))
 
 class VolumeDetector:
     """Real-time microphone volume detector for blob animation"""
     
-    def __init__(self, chunk_size=1024, format=pyaudio.paFloat32, channels=1, rate=44100):
+    def __init__(self, chunk_size=512, rate=16000, bus=capture_bus):
         self.chunk_size = chunk_size
-        self.format = format
-        self.channels = channels
         self.rate = rate
-        self.audio = pyaudio.PyAudio()
-        self.stream = None
+        self.bus = bus
+        self.subscription = None
         self.is_listening = False
         self.volume_queue = queue.Queue(maxsize=10)
         self.current_volume = 0.0
         self.volume_thread = None
+        self.extractor = AudioFeatureExtractor(chunk_size, rate)
+        self.current_features = None
         
     def start_listening(self):
-        """Start listening for microphone input"""
+        """Start listening for microphone input; returns False if the microphone could not be opened"""
         if self.is_listening:
-            return
+            return True
             
         try:
-            self.stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
+            # Share the microphone with speech recognition instead of opening a second stream
+            self.subscription = self.bus.subscribe("volume", self.rate, self.chunk_size, np.float32)
+            self.bus.start()
             
             self.is_listening = True
             self.volume_thread = threading.Thread(target=self._volume_loop, daemon=True)
             self.volume_thread.start()
             print("[VolumeDetector] Started listening for volume levels")
+            return True
             
         except Exception as e:
             print(f"[VolumeDetector] Error starting volume detection: {e}")
+            if self.subscription:
+                self.subscription.close()
+                self.subscription = None
+            return False
     
     def stop_listening(self):
         """Stop listening for microphone input"""
@@ -48,9 +104,9 @@ class VolumeDetector:
         if self.volume_thread:
             self.volume_thread.join(timeout=1)
             
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
+        if self.subscription:
+            self.subscription.close()
+            self.subscription = None
             
         print("[VolumeDetector] Stopped listening for volume levels")
     
@@ -58,12 +114,10 @@ class VolumeDetector:
         """Main volume detection loop"""
         while self.is_listening:
             try:
-                if self.stream:
-                    data = self.stream.read(self.chunk_size, exception_on_overflow=False)
-                    audio_data = np.frombuffer(data, dtype=np.float32)
-                    
-                    # Calculate RMS volume
-                    rms = np.sqrt(np.mean(audio_data**2))
+                audio_data = self.subscription.read_frame(timeout=0.5)
+                if audio_data is not None:
+                    self.current_features = self.extractor.extract(audio_data)
+                    rms = self.current_features.rms
                     
                     # Convert to a 0-1 scale with some smoothing
                     volume = min(1.0, rms * 10)  # Adjust multiplier as needed
@@ -90,6 +144,10 @@ class VolumeDetector:
         """Get the current volume level (0.0 to 1.0)"""
         return self.current_volume
     
+    def get_current_features(self):
+        """Get the latest AudioFeatures (None until the first chunk arrives)"""
+        return self.current_features
+    
     def get_volume_from_queue(self):
         """Get volume from queue (non-blocking)"""
         try:
@@ -100,8 +158,6 @@ class VolumeDetector:
     def cleanup(self):
         """Clean up resources"""
         self.stop_listening()
-        if self.audio:
-            self.audio.terminate()
 
 # Global instance for easy access
 volume_detector = VolumeDetector()
@@ -110,15 +166,38 @@ def get_volume_level():
     """Get current volume level for external use"""
     return volume_detector.get_current_volume()
 
+def get_audio_features():
+    """Get the latest feature frame for external use"""
+    return volume_detector.get_current_features()
+
+def benchmark_feature_extractor(chunks=5000, chunk_size=512, rate=16000):
+    """Per-chunk extraction cost compared with the real-time duration of a chunk"""
+    extractor = AudioFeatureExtractor(chunk_size, rate)
+    rng = np.random.default_rng(0)
+    frames = (rng.standard_normal((64, chunk_size)) * 0.1).astype(np.float32)
+    for frame in frames:
+        extractor.extract(frame)  # Warm-up
+    started = time.perf_counter()
+    for i in range(chunks):
+        extractor.extract(frames[i % len(frames)])
+    per_chunk = (time.perf_counter() - started) / chunks
+    chunk_duration = chunk_size / rate
+    print(f"[VolumeDetector] Feature extraction: {per_chunk * 1e6:.1f} us per {chunk_size}-sample chunk "
+          f"({chunk_duration * 1000:.0f} ms of audio, {100 * per_chunk / chunk_duration:.2f}% of real time)")
+    return per_chunk
+
 def start_volume_detection():
-    """Start volume detection"""
-    volume_detector.start_listening()
+    """Start volume detection; returns False if the microphone is unavailable"""
+    return volume_detector.start_listening()
 
 def stop_volume_detection():
     """Stop volume detection"""
     volume_detector.stop_listening()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark_feature_extractor()
+        sys.exit()
     # Test the volume detector
     try:
         start_volume_detection()
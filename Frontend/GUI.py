@@ -143,6 +143,8 @@ class AdvancedChatWidget(QWidget):
         super().__init__()
         self.backend_manager = backend_manager
         self.message_count = 0
+        self.stream_start = None  # Document position of the assistant bubble being streamed
+        self.stream_text = ""
         self.typing_animation_timer = QTimer()
         self.typing_animation_timer.timeout.connect(self.update_typing_animation)
         self.typing_dots = 0
@@ -472,6 +474,8 @@ class AdvancedChatWidget(QWidget):
         """Setup connections to backend manager"""
         if self.backend_manager:
             self.backend_manager.chat_response.connect(self.handle_assistant_response)
+            self.backend_manager.chat_delta.connect(self.handle_assistant_delta)
+            self.backend_manager.stream_finished.connect(self.end_stream)
             self.backend_manager.status_update.connect(self.handle_status_update)
             self.backend_manager.voice_input.connect(self.handle_voice_input)
             self.backend_manager.error_occurred.connect(self.handle_error)
@@ -541,10 +545,8 @@ class AdvancedChatWidget(QWidget):
             else:
                 run_in_thread(self.backend_manager.process_input, text, "text")
     
-    def handle_assistant_response(self, response):
-        """Handle QUANTUM response"""
-        self.is_typing = False
-        # Replace placeholder with real response if present
+    def remove_placeholder(self):
+        """Remove the 'thinking' placeholder message if present"""
         if hasattr(self, 'placeholder_cursor') and self.placeholder_cursor is not None:
             cursor = self.chat_area.textCursor()
             self.chat_area.setTextCursor(self.placeholder_cursor)
@@ -553,6 +555,49 @@ class AdvancedChatWidget(QWidget):
             self.chat_area.textCursor().removeSelectedText()
             self.chat_area.setTextCursor(cursor)
             self.placeholder_cursor = None
+
+    def remove_streamed_message(self):
+        """Remove the partially streamed assistant bubble"""
+        if self.stream_start is not None:
+            cursor = self.chat_area.textCursor()
+            cursor.setPosition(self.stream_start)
+            cursor.movePosition(cursor.End, cursor.KeepAnchor)
+            cursor.removeSelectedText()
+            self.stream_start = None
+            self.stream_text = ""
+
+    def end_stream(self):
+        """Stop treating the streamed bubble as live; a partial answer of a cancelled request stays as shown"""
+        self.stream_start = None
+        self.stream_text = ""
+
+    def handle_assistant_delta(self, delta):
+        """Grow the QUANTUM assistant bubble as the response streams in"""
+        self.is_typing = False
+        cursor = self.chat_area.textCursor()
+        if self.stream_start is None:
+            self.remove_placeholder()
+            cursor.movePosition(cursor.End)
+            self.stream_start = cursor.position()
+        else:
+            # Re-render the bubble with the text received so far
+            cursor.setPosition(self.stream_start)
+            cursor.movePosition(cursor.End, cursor.KeepAnchor)
+            cursor.removeSelectedText()
+        self.stream_text += delta
+        timestamp = QDateTime.currentDateTime().toString("HH:mm:ss.zzz")
+        cursor.insertHtml(self._message_html("assistant", self.stream_text, timestamp))
+        
+        scrollbar = self.chat_area.verticalScrollBar()
+        if scrollbar:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def handle_assistant_response(self, response):
+        """Handle QUANTUM response"""
+        self.is_typing = False
+        # Replace placeholder or streamed bubble with the final response
+        self.remove_placeholder()
+        self.remove_streamed_message()
         self.append_message("assistant", response)
     
     def handle_voice_input(self, voice_text):
@@ -585,13 +630,8 @@ class AdvancedChatWidget(QWidget):
             self.voice_visualizer.set_listening(False)
             self.voice_visualizer.set_speaking(False)
     
-    def append_message(self, role, message):
-        """Append QUANTUM message with futuristic styling"""
-        self.message_count += 1
-        
-        # QUANTUM timestamp
-        timestamp = QDateTime.currentDateTime().toString("HH:mm:ss.zzz")
-        
+    def _message_html(self, role, message, timestamp):
+        """Build the QUANTUM chat bubble HTML for a message"""
         if role == "user":
             # QUANTUM user message
             message_html = f"""
@@ -659,6 +699,18 @@ class AdvancedChatWidget(QWidget):
                 </div>
             </div>
             """
+        return message_html
+
+    def append_message(self, role, message):
+        """Append QUANTUM message with futuristic styling"""
+        self.message_count += 1
+        if role == "user":
+            # A new request starts its own bubble; never rewrite from an older stream's position
+            self.end_stream()
+        
+        # QUANTUM timestamp
+        timestamp = QDateTime.currentDateTime().toString("HH:mm:ss.zzz")
+        message_html = self._message_html(role, message, timestamp)
         
         # Add message with QUANTUM scrolling
         cursor = self.chat_area.textCursor()
@@ -884,6 +936,7 @@ class UltraJarvisBlobWidget(QWidget):
         
         # Organic shape parameters
         self.n_points = 60
+        self.band_levels = None  # Per-band microphone levels (0-1) from the backend, if available
         self.morph_intensity = 0.0
         self.organic_noise = 0.0
         
@@ -1005,6 +1058,11 @@ class UltraJarvisBlobWidget(QWidget):
                 light['x'] += self.random_generator.uniform(-0.1, 0.1)
                 light['y'] += self.random_generator.uniform(-0.1, 0.1)
 
+    def set_features(self, features):
+        """Let the microphone's band levels shape the outline instead of random jitter"""
+        self.band_levels = features.bands
+        self.update()
+
     def set_amplitude(self, amplitude):
         # Use amplitude for dynamic effects
         self.particle_life = amplitude
@@ -1307,8 +1365,14 @@ class UltraJarvisBlobWidget(QWidget):
                 math.sin(self.morph_phase * 1.3 + angle * 7) * 0.06
             )
             
-            # Add state-specific distortion with randomness
-            if self.state == 'speaking':
+            # Add state-specific distortion, scaled by the band this point maps to when real levels are available
+            if self.band_levels:
+                band_level = self.band_levels[i * len(self.band_levels) // self.n_points]
+                if self.state == 'speaking':
+                    morph_factor += 0.2 * (0.3 + band_level) * math.sin(angle * 6 + self.pulse_phase * 2)
+                elif self.state == 'listening':
+                    morph_factor += 0.15 * (0.3 + band_level) * math.sin(angle * 4 + self.pulse_phase * 1.5)
+            elif self.state == 'speaking':
                 speech_distortion = 0.2 * math.sin(angle * 6 + self.pulse_phase * 2 + self.random_generator.uniform(-0.5, 0.5))
                 morph_factor += speech_distortion
             elif self.state == 'listening':
@@ -1479,6 +1543,8 @@ class BlobHomeWindow(QMainWindow):
         self.backend_manager.error_occurred.connect(self._show_error)
         self.backend_manager.go_home_requested.connect(self._go_home)
         self.backend_manager.volume_update.connect(self.blob_widget.set_amplitude)
+        if hasattr(self.backend_manager, 'audio_features'):
+            self.backend_manager.audio_features.connect(self.blob_widget.set_features)
         
         # Status label
         self.status_label = QLabel("Ready")
@@ -1496,6 +1562,17 @@ class BlobHomeWindow(QMainWindow):
         """)
         layout.addWidget(self.status_label)
         
+        # Backend module load state (modules warm up in the background after the window shows)
+        self.modules_label = QLabel("")
+        self.modules_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.modules_label.setStyleSheet("QLabel { color: #668899; font-size: 11px; }")
+        layout.addWidget(self.modules_label)
+        self.module_states = {}
+        if hasattr(self.backend_manager, 'module_status'):
+            self.backend_manager.module_status.connect(self._update_module_status)
+            for name, state in self.backend_manager.modules.statuses().items():
+                self._update_module_status(name, state)
+        
         # Navigation buttons
         button_layout = QHBoxLayout()
         
@@ -1539,6 +1616,17 @@ class BlobHomeWindow(QMainWindow):
         """Set reference to chat window for navigation"""
         self.chat_window = chat_window
 
+    def _update_module_status(self, name, state):
+        """Show how many backend modules are ready and which failed to load"""
+        self.module_states[name] = state
+        ready = sum(1 for value in self.module_states.values() if value == "ready")
+        failed = [module for module, value in self.module_states.items() if value == "failed"]
+        text = f"Modules ready: {ready}/{len(self.module_states)}"
+        if failed:
+            text += f" | unavailable: {', '.join(failed)}"
+        self.modules_label.setText(text)
+        self.modules_label.setToolTip("\n".join(f"{module}: {value}" for module, value in self.module_states.items()))
+
     def _update_status(self, status):
         if "sleeping" in status.lower():
             self.blob_widget.set_state('sleeping')
@@ -1670,7 +1758,12 @@ class ModernVoiceVisualizer(QWidget):
         self.listening_intensity = 0.0
         self.energy_level = 0.0
         self.pulse_phase = 0.0
+        self.band_levels = None  # Real per-band levels (0-1) from the backend, one per bar
         
+    def set_features(self, features):
+        """Drive the bars from the microphone's band levels"""
+        self.band_levels = features.bands
+    
     def set_listening(self, listening):
         self.is_listening = listening
         if not listening:
@@ -1702,7 +1795,13 @@ class ModernVoiceVisualizer(QWidget):
         """Advanced bar update with dynamic effects"""
         self.pulse_phase += 0.1
         
-        if self.is_listening:
+        if self.band_levels:
+            # Real spectrum: bars jump up to the band level and fall back smoothly
+            scale = 1.0 if (self.is_listening or self.is_speaking) else 0.3
+            for i in range(len(self.bars)):
+                level = self.band_levels[i * len(self.band_levels) // len(self.bars)] * scale
+                self.bars[i] = max(level, self.bars[i] - 0.06)
+        elif self.is_listening:
             # Dynamic listening visualization
             for i in range(len(self.bars)):
                 if random.random() < 0.4:  # Higher chance for more activity
@@ -1823,6 +1922,8 @@ class ChatWindow(QMainWindow):
         # Connect backend signals
         if self.backend_manager:
             self.backend_manager.status_update.connect(self.on_status_update)
+            if hasattr(self.backend_manager, 'audio_features'):
+                self.backend_manager.audio_features.connect(self.voice_visualizer.set_features)
         # State
         self.is_listening = False
 
@@ -6,26 +6,195 @@ Main entry point with proper backend integration and parallelism
 
 import sys
 import os
+import asyncio
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QThread, pyqtSignal, QObject, QTimer
 from Frontend.GUI import AdvancedMainWindow, BlobHomeWindow, ChatWindow
+from Backend.ModuleRegistry import ModuleRegistry, ModuleUnavailable
+from Backend.EventLoop import backend_loop
+
+# Fixed replies; their audio is pre-rendered into the TTS phrase cache at startup
+SLEEP_MESSAGE = "Going to sleep. Say 'wake up jarvis' to wake me up."
+WAKE_MESSAGE = "Hello! I'm awake and ready to help you."
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Sleep/wake phrases, including common mishearings
+SLEEP_KEYWORDS = [
+    'sleep jarvis', 'jarvis sleep', 'go to sleep', 'sleep',
+    'slip jarvis', 'jarvis slip', 'slip',  # Common misheard as "slip"
+    'flip jarvis', 'jarvis flip', 'flip',  # Common misheard as "flip"
+    'sleep please', 'slip please', 'flip please'
+]
+WAKE_KEYWORDS = [
+    'wake up jarvis', 'jarvis wake up', 'wake up', 'wake',
+    'wake jarvis', 'jarvis wake',           # Shorter version
+    'wake up please', 'wake please',        # With please
+    'get up jarvis', 'jarvis get up', 'get up',  # Alternative wake commands
+    'rise jarvis', 'jarvis rise', 'rise'    # Another alternative
+]
+# Spotter keywords that wake the assistant, and how often the full recognizer still listens while asleep
+WAKE_SPOTTER_KEYWORDS = ("jarvis", "wake up")
+SLEEP_RECHECK_SECONDS = 30
+CONTROL_COMMANDS = ['go home', 'home', 'bye', 'goodbye', 'exit', 'quit', 'close',
+                    'stop', 'jarvis', 'assistant', 'halt', 'pause', 'shut up']
+AUTOMATION_KEYWORDS = ["open", "play", "search", "mute", "unmute", "volume", "close", "exit", "quit"]
+IMAGE_KEYWORDS = ["image", "picture", "photo"]
+# Words that make a realtime decision likely enough to start the web search before the decision arrives
+REALTIME_HINTS = ["news", "today", "latest", "current", "price", "stock", "weather", "score", "who is", "who won",
+                  "update", "right now", "this week", "headline", "election", "match"]
+
+class Request:
+    """One user input travelling through the scheduler"""
+    
+    def __init__(self, text, input_type, lane):
+        self.text = text
+        self.input_type = input_type
+        self.lane = lane
+        self.created = time.perf_counter()
+        self.started = None
+        self.task = None
+        self.speculation = None  # Future of a web search started next to the decision
+        self.cancel_event = threading.Event()  # Checked by blocking stages running in worker threads
+    
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+class RequestScheduler:
+    """Runs user requests as asyncio tasks on the backend loop, one lane per priority class
+    
+    Lanes run independently, so a "volume up" never waits behind a slow search: system controls and
+    interrupts, automation, and LLM queries each process their own queue in order. A new query supersedes
+    queued and running ones. Blocking stages run in worker threads under a per-stage timeout."""
+    
+    LANES = ("system", "automation", "query")
+    TIMEOUTS = {"control": 10, "decision": 20, "automation": 60, "images": 180, "query": 120}
+    
+    def __init__(self, handler, event_loop=backend_loop, on_cancel=None):
+        self.handler = handler  # async handler(request)
+        self.on_cancel = on_cancel  # on_cancel(request), called on the loop once a running request is flagged cancelled
+        self.event_loop = event_loop
+        self.loop = event_loop.start()
+        self.queues = {lane: asyncio.Queue() for lane in self.LANES}
+        self.running = {lane: None for lane in self.LANES}
+        self.metrics = {lane: {"submitted": 0, "started": 0, "completed": 0, "cancelled": 0, "timed_out": 0, "failed": 0,
+                               "wait_ms_total": 0.0, "wait_ms_max": 0.0, "run_ms_total": 0.0} for lane in self.LANES}
+        self.stopping = False
+        self.workers = [event_loop.submit(self._worker(lane)) for lane in self.LANES]
+    
+    def submit(self, text, input_type, lane):
+        """Queue a request from any thread; a query cancels the queries before it"""
+        request = Request(text, input_type, lane)
+        self.metrics[lane]["submitted"] += 1
+        if lane == "query":
+            self.loop.call_soon_threadsafe(self._cancel_lane, "query", "superseded")
+        self.loop.call_soon_threadsafe(self.queues[lane].put_nowait, request)
+        return request
+    
+    def cancel(self, lane, reason="cancelled"):
+        """Drop queued requests of a lane and cancel the running one (thread-safe)"""
+        self.loop.call_soon_threadsafe(self._cancel_lane, lane, reason)
+    
+    def _cancel_lane(self, lane, reason):
+        queue = self.queues[lane]
+        while not queue.empty():
+            request = queue.get_nowait()
+            request.cancel_event.set()
+            self.metrics[lane]["cancelled"] += 1
+            print(f"[Scheduler] Dropped queued {lane} request ({reason}): {request.text}")
+        request = self.running[lane]
+        if request is not None and not request.cancelled:
+            request.cancel_event.set()
+            request.task.cancel()
+            print(f"[Scheduler] Cancelled running {lane} request ({reason}): {request.text}")
+            if self.on_cancel is not None:
+                self.on_cancel(request)
+    
+    async def _worker(self, lane):
+        queue = self.queues[lane]
+        metrics = self.metrics[lane]
+        while True:
+            request = await queue.get()
+            if request.cancelled:
+                continue
+            request.started = time.perf_counter()
+            metrics["started"] += 1
+            wait_ms = (request.started - request.created) * 1000
+            metrics["wait_ms_total"] += wait_ms
+            metrics["wait_ms_max"] = max(metrics["wait_ms_max"], wait_ms)
+            self.running[lane] = request
+            request.task = self.loop.create_task(self.handler(request))
+            try:
+                await request.task
+                metrics["completed"] += 1
+            except asyncio.CancelledError:
+                if self.stopping or not request.task.cancelled():
+                    # The worker itself is being cancelled (stop()), not just this request: end the loop
+                    request.task.cancel()
+                    raise
+                metrics["cancelled"] += 1
+            except asyncio.TimeoutError:
+                request.cancel_event.set()
+                metrics["timed_out"] += 1
+            except Exception as e:
+                metrics["failed"] += 1
+                print(f"[Scheduler] {lane} request failed: {e}")
+            finally:
+                self.running[lane] = None
+                metrics["run_ms_total"] += (time.perf_counter() - request.started) * 1000
+    
+    async def stage(self, request, name, fn, *args):
+        """Run one blocking stage of a request in a worker thread, bounded by that stage's timeout"""
+        if request.cancelled:
+            raise asyncio.CancelledError()
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(fn, *args), self.TIMEOUTS[name])
+        except asyncio.TimeoutError:
+            print(f"[Scheduler] {name} stage timed out after {self.TIMEOUTS[name]}s: {request.text}")
+            request.cancel_event.set()
+            raise
+    
+    def depth(self):
+        return {lane: self.queues[lane].qsize() + (self.running[lane] is not None) for lane in self.LANES}
+    
+    def stats(self):
+        """Per-lane counters plus current queue depth and average wait/run milliseconds"""
+        depth = self.depth()
+        stats = {}
+        for lane, m in self.metrics.items():
+            started = max(m["started"], 1)
+            stats[lane] = {key: m[key] for key in ("submitted", "completed", "cancelled", "timed_out", "failed")}
+            stats[lane].update(depth=depth[lane], wait_ms_avg=round(m["wait_ms_total"] / started, 1),
+                               wait_ms_max=round(m["wait_ms_max"], 1), run_ms_avg=round(m["run_ms_total"] / started, 1))
+        return stats
+    
+    def stop(self):
+        self.stopping = True
+        for lane in self.LANES:
+            self.cancel(lane, "shutdown")
+        for worker in self.workers:
+            worker.cancel()
+
 class BackendManager(QObject):
     """Centralized backend manager for coordinating all operations"""
     
     # Signals for GUI communication
     chat_response = pyqtSignal(str)  # Assistant response
+    chat_delta = pyqtSignal(str)     # Partial assistant response while it streams
+    stream_finished = pyqtSignal()   # A request ended (answered, cancelled, timed out or failed)
     status_update = pyqtSignal(str)  # Status updates
     voice_input = pyqtSignal(str)    # Voice input received
     error_occurred = pyqtSignal(str) # Error messages
     exitRequested = pyqtSignal()     # Exit signal
     go_home_requested = pyqtSignal()
     volume_update = pyqtSignal(float)  # Volume level updates
+    audio_features = pyqtSignal(object)  # VolumeDetector.AudioFeatures for the visualizers
+    module_status = pyqtSignal(str, str)  # Backend module name and its load state
     
     def __init__(self):
         super().__init__()
@@ -33,7 +202,9 @@ class BackendManager(QObject):
         self.is_sleeping = False  # New: Track sleep state
         self.current_tts_thread = None
         self.stt_thread = None
-        self.processing_lock = threading.Lock()
+        self.scheduler = RequestScheduler(self._handle_request, on_cancel=self._on_request_cancelled)
+        self.speculation_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculate")
+        self.speculation_stats = {"started": 0, "useful": 0, "wasted": 0, "saved_ms": 0.0}
         self.last_voice_input = None
         self.last_voice_time = 0
         self.volume_timer = QTimer()
@@ -42,52 +213,81 @@ class BackendManager(QObject):
         # Initialize backend modules
         self._init_backend_modules()
         self._init_volume_detection()
+        self._init_echo_cancellation()
+        self._init_keyword_spotting()
+        self._init_barge_in()
+    
+    # Start realtime searches next to the decision call when the wording suggests one
+    SPECULATIVE_SEARCH = True
+    
+    # Backend callables, resolved through the module registry on first use
+    LAZY_ATTRIBUTES = {
+        "FirstLayerDMM": ("model", "FirstLayerDMM"),
+        "ChatBot": ("chatbot", "ChatBot"),
+        "ChatBotStream": ("chatbot", "ChatBotStream"),
+        "AnswerModifier": ("chatbot", "AnswerModifier"),
+        "RealtimeSearchEngine": ("search", "RealtimeSearchEngine"),
+        "RealtimeSearchEngineStream": ("search", "RealtimeSearchEngineStream"),
+        "Automation": ("automation", "Automation"),
+        "GenerateImages": ("images", "GenerateImages"),
+        "TextToSpeech": ("tts", "TextToSpeech"),
+        "QueueSpeech": ("tts", "QueueSpeech"),
+        "SentenceSplitter": ("tts", "SentenceSplitter"),
+        "check_for_interruption": ("tts", "check_for_interruption"),
+        "SpeechRecognition": ("speech", "SpeechRecognition"),
+    }
+    
+    def __getattr__(self, name):
+        target = BackendManager.LAZY_ATTRIBUTES.get(name)
+        if target is None:
+            raise AttributeError(name)
+        return getattr(self.modules.get(target[0]), target[1])
     
     def _init_backend_modules(self):
-        """Initialize all backend modules"""
-        try:
-            # Import all backend modules
-            from Backend.Model import FirstLayerDMM
-            from Backend.Chatbot import ChatBot
-            from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-            from Backend.Automation import Automation
-            from Backend.ImageGeneration import GenerateImages
-            from Backend.TextToSpeech import TextToSpeech, stop_tts, check_for_interruption
-            from Backend.SpeechToText import SpeechRecognition
-            
-            # Store module references
-            self.FirstLayerDMM = FirstLayerDMM
-            self.ChatBot = ChatBot
-            self.RealtimeSearchEngine = RealtimeSearchEngine
-            self.Automation = Automation
-            self.GenerateImages = GenerateImages
-            self.TextToSpeech = TextToSpeech
-            self.stop_tts = stop_tts
-            self.check_for_interruption = check_for_interruption
-            self.SpeechRecognition = SpeechRecognition
-            
-            # Override stop_tts to also reset state
-            original_stop_tts = self.stop_tts
-            def enhanced_stop_tts():
-                original_stop_tts()
-                if hasattr(self, 'current_state'):
-                    self.current_state = 'idle'
-            self.stop_tts = enhanced_stop_tts
-            
-            print("[BackendManager] All modules initialized successfully")
-            
-        except Exception as e:
-            print(f"[BackendManager] Error initializing modules: {e}")
-            self.error_occurred.emit(f"Backend initialization failed: {e}")
+        """Register backend modules and warm them in the background so the window shows immediately"""
+        def prewarm_phrases(module):
+            module.prewarm_tts_cache([SLEEP_MESSAGE, WAKE_MESSAGE])
+        
+        def prewarm_automation_phrases(module):
+            try:
+                self.modules.get("tts").prewarm_tts_cache(module.professional_responses)
+            except ModuleUnavailable:
+                pass
+        
+        # Lower priority numbers are warmed first: speech I/O, then the decision model, then the rest
+        self.modules = ModuleRegistry()
+        self.modules.register("tts", "Backend.TextToSpeech", init=prewarm_phrases, priority=10)
+        self.modules.register("speech", "Backend.SpeechToText", priority=20)
+        self.modules.register("model", "Backend.Model", priority=30)
+        self.modules.register("chatbot", "Backend.Chatbot", priority=40)
+        self.modules.register("search", "Backend.RealtimeSearchEngine", priority=50)
+        self.modules.register("automation", "Backend.Automation", init=prewarm_automation_phrases, priority=60)
+        self.modules.register("images", "Backend.ImageGeneration", priority=70)
+        self.modules.add_listener(lambda name, state, detail: self.module_status.emit(name, state))
+        self.modules.warm(on_done=lambda: print("[BackendManager] All modules initialized"))
+    
+    def stop_tts(self):
+        """Stop speech and reset state; does not load TTS if nothing has been spoken yet"""
+        if self.modules.is_ready("tts"):
+            self.modules.get("tts").stop_tts()
+        if hasattr(self, 'current_state'):
+            self.current_state = 'idle'
+    
+    def _on_request_cancelled(self, request):
+        """A superseded or interrupted query must not keep speaking the sentences it already queued"""
+        if request.lane == "query":
+            self.stop_tts()
     
     def _init_volume_detection(self):
         """Initialize volume detection"""
         try:
-            from Backend.VolumeDetector import start_volume_detection, get_volume_level
+            from Backend.VolumeDetector import start_volume_detection, get_volume_level, get_audio_features
             self.start_volume_detection = start_volume_detection
             self.get_volume_level = get_volume_level
+            self.get_audio_features = get_audio_features
             # Start volume detection
-            self.start_volume_detection()
+            if not self.start_volume_detection():
+                raise RuntimeError("microphone unavailable")
             # Start timer to send volume updates to GUI
             self.volume_timer.start(50)  # Update every 50ms (20 FPS)
             print("[BackendManager] Volume detection initialized")
@@ -102,12 +302,84 @@ class BackendManager(QObject):
             self.volume_timer.start(50)  # Update every 50ms (20 FPS)
             print("[BackendManager] Using simulated volume detection")
     
+    def _init_echo_cancellation(self):
+        """Remove the assistant's own voice from the shared microphone before the meter, VAD and recognizer"""
+        self.echo_canceller = None
+        if not self.volume_detection_available:
+            return
+        try:
+            from Backend.AudioCapture import capture_bus
+            from Backend.AudioPlayer import audio_player
+            from Backend.EchoCanceller import attach_echo_canceller
+            self.echo_canceller = attach_echo_canceller(capture_bus, audio_player)
+        except Exception as e:
+            print(f"[BackendManager] Echo cancellation unavailable: {e}")
+    
+    def _init_keyword_spotting(self):
+        """Spot "jarvis", "wake up" and "stop" on the microphone so sleep mode and barge-in skip the full recognizer"""
+        self.keyword_spotter = None
+        try:
+            from Backend.KeywordSpotter import keyword_spotter
+            if not keyword_spotter.load_templates():
+                print("[BackendManager] No keywords enrolled; run python -m Backend.KeywordSpotter --enroll jarvis")
+                return
+            keyword_spotter.is_active = lambda: self.is_sleeping or self._tts_playing()
+            keyword_spotter.add_listener(self._on_keyword)
+            keyword_spotter.start()
+            self.keyword_spotter = keyword_spotter
+        except Exception as e:
+            print(f"[BackendManager] Keyword spotting unavailable: {e}")
+    
+    def _init_barge_in(self):
+        """Stop speech as soon as the user talks over it, instead of waiting for a full transcript"""
+        self.barge_in = None
+        if not self.volume_detection_available:
+            return
+        try:
+            from Backend.AudioPlayer import audio_player
+            from Backend.BargeIn import BargeInMonitor
+            self.barge_in = BargeInMonitor(audio_player)
+            self.barge_in.start(self._on_barge_in)
+        except Exception as e:
+            self.barge_in = None
+            print(f"[BackendManager] Barge-in unavailable: {e}")
+    
+    def _on_barge_in(self):
+        """Runs on the barge-in thread once playback has been cut; drop the rest of the answer and listen"""
+        self.stop_tts()
+        self.status_update.emit("Listening...")
+    
+    def _tts_playing(self):
+        return self.modules.is_ready("tts") and self.modules.get("tts").is_tts_playing()
+    
+    def _on_keyword(self, keyword, distance):
+        """Runs on the spotter thread when an enrolled keyword is heard"""
+        if self.is_sleeping:
+            if keyword in WAKE_SPOTTER_KEYWORDS:
+                self._wake_up()
+        elif keyword in ("stop", "jarvis") and self._tts_playing():
+            print(f"[BackendManager] Interrupted by keyword '{keyword}'")
+            self.stop_tts()
+            self.status_update.emit("Stopped by user")
+    
+    def _wake_up(self):
+        print("[BackendManager] Wake command detected")
+        self.is_sleeping = False
+        self.chat_response.emit(WAKE_MESSAGE)
+        self.status_update.emit("Awake and ready...")
+        self._speak_response(WAKE_MESSAGE)
+        if hasattr(self, 'current_state'):
+            self.current_state = 'idle'
+    
     def _update_volume(self):
         """Update volume level and send to GUI"""
         if hasattr(self, 'volume_detection_available') and self.volume_detection_available:
             try:
                 volume = self.get_volume_level()
                 self.volume_update.emit(volume)
+                features = self.get_audio_features()
+                if features is not None:
+                    self.audio_features.emit(features)
             except Exception as e:
                 print(f"[BackendManager] Error updating volume: {e}")
         else:
@@ -128,136 +400,214 @@ class BackendManager(QObject):
             
             self.volume_update.emit(self.simulated_volume)
     
+    def _recognizer_echo_free(self):
+        """The canceller only cleans the capture bus; the browser recognizer records its own microphone"""
+        return (self.echo_canceller is not None and self.modules.is_ready("speech")
+                and self.modules.get("speech").uses_capture_bus())
+    
     def process_input(self, user_input, input_type="text"):
-        """Process user input (text or voice) with proper coordination"""
+        """Queue user input (text or voice) on the request scheduler and return without waiting for it"""
         if not self.is_running:
-            return
-        # Prevent duplicate voice input within 2 seconds
-        if input_type == "voice":
+            return None
+        # Unless the recognizer hears the echo-cancelled capture bus it can transcribe our own speech; drop repeats
+        if input_type == "voice" and not self._recognizer_echo_free():
             now = time.time()
             if user_input == self.last_voice_input and (now - self.last_voice_time) < 2:
                 print(f"[BackendManager] Ignoring duplicate voice input: {user_input}")
-                return
+                return None
             self.last_voice_input = user_input
             self.last_voice_time = now
-        with self.processing_lock:
-            try:
-                print(f"[BackendManager] Processing {input_type} input: {user_input}")
-                self.status_update.emit("Processing...")
-                
-                # Update current state for volume simulation
-                if hasattr(self, 'current_state'):
-                    self.current_state = 'processing'
-                
-                # Home command
-                if user_input.lower().strip() in ["go home", "home"]:
-                    print("[BackendManager] Home command detected")
-                    self.go_home_requested.emit()
-                    return
-                
-                # Check for exit commands FIRST (before anything else)
-                if user_input.lower().strip() in ['bye', 'goodbye', 'exit', 'quit', 'close']:
-                    print("[BackendManager] Exit command detected")
-                    self.chat_response.emit("Goodbye! Closing the application...")
-                    self.status_update.emit("Closing...")
-                    # Stop all operations
-                    self.is_running = False
-                    self.stop_tts()
-                    # Emit exit signal to close application
-                    self.exitRequested.emit()
-                    return
-                
-                # Check for sleep/wake commands
-                command = user_input.lower().strip()
-                # Remove punctuation and common words for more flexible matching
-                clean_command = command.rstrip('.,!?').strip()
-                
-                # Check if the command contains sleep keywords (including common misheard variations)
-                sleep_keywords = [
-                    'sleep jarvis', 'jarvis sleep', 'go to sleep', 'sleep',
-                    'slip jarvis', 'jarvis slip', 'slip',  # Common misheard as "slip"
-                    'flip jarvis', 'jarvis flip', 'flip',  # Common misheard as "flip"
-                    'slip jarvis', 'jarvis slip',          # Another variation
-                    'sleep please', 'slip please', 'flip please'
-                ]
-                is_sleep_command = any(keyword in clean_command for keyword in sleep_keywords)
-                
-                if is_sleep_command:
-                    if not self.is_sleeping:
-                        print("[BackendManager] Sleep command detected")
-                        self.is_sleeping = True
-                        self.chat_response.emit("Going to sleep. Say 'wake up jarvis' to wake me up.")
-                        self.status_update.emit("Sleeping...")
-                        self._speak_response("Going to sleep. Say 'wake up jarvis' to wake me up.")
-                        if hasattr(self, 'current_state'):
-                            self.current_state = 'sleeping'
-                        return
-                    else:
-                        print("[BackendManager] Already sleeping")
-                        return
-                
-                # Check if the command contains wake keywords (including common misheard variations)
-                wake_keywords = [
-                    'wake up jarvis', 'jarvis wake up', 'wake up', 'wake',
-                    'wake jarvis', 'jarvis wake',           # Shorter version
-                    'wake up please', 'wake please',        # With please
-                    'get up jarvis', 'jarvis get up', 'get up',  # Alternative wake commands
-                    'rise jarvis', 'jarvis rise', 'rise'    # Another alternative
-                ]
-                is_wake_command = any(keyword in clean_command for keyword in wake_keywords)
-                
-                if is_wake_command:
-                    if self.is_sleeping:
-                        print("[BackendManager] Wake command detected")
-                        self.is_sleeping = False
-                        self.chat_response.emit("Hello! I'm awake and ready to help you.")
-                        self.status_update.emit("Awake and ready...")
-                        self._speak_response("Hello! I'm awake and ready to help you.")
-                        if hasattr(self, 'current_state'):
-                            self.current_state = 'idle'
-                        return
-                    else:
-                        print("[BackendManager] Already awake")
-                        return
-                
-                # If sleeping, don't process any other commands except wake up
-                if self.is_sleeping:
-                    print(f"[BackendManager] Ignoring command while sleeping: {user_input}")
-                    return
-                
-                # Check for interruption keywords
-                if self.check_for_interruption(user_input):
-                    print("[BackendManager] Interruption detected")
-                    self.stop_tts()
-                    self.status_update.emit("Stopped by user")
-                    if hasattr(self, 'current_state'):
-                        self.current_state = 'idle'
-                    # Don't return here, continue processing the command if it's not just an interruption
-                    # Only return if it's just an interruption command
-                    if user_input.lower().strip() in ['stop', 'jarvis', 'assistant', 'halt', 'pause']:
-                        return
-                
-                # Use the decision-making system
-                decision = self.FirstLayerDMM(user_input)
-                print(f"[BackendManager] Decision: {decision}")
-                
-                # Process based on decision
-                response = self._execute_decision(user_input, decision)
-                
-                if response and self.is_running:
-                    self.chat_response.emit(response)
-                    self.status_update.emit("Available...")
-                    if hasattr(self, 'current_state'):
-                        self.current_state = 'idle'
-                
-            except Exception as e:
-                print(f"[BackendManager] Error processing input: {e}")
-                self.error_occurred.emit(f"Processing error: {e}")
-                self.status_update.emit("Error occurred")
+        request = self.scheduler.submit(user_input, input_type, self._request_lane(user_input))
+        print(f"[BackendManager] Queued {input_type} input on the {request.lane} lane: {user_input}")
+        return request
+    
+    def _request_lane(self, user_input):
+        """Priority class of an input, decided from its words before any model runs"""
+        clean_command = user_input.lower().strip().rstrip('.,!?').strip()
+        if clean_command in CONTROL_COMMANDS or any(keyword in clean_command for keyword in SLEEP_KEYWORDS + WAKE_KEYWORDS):
+            return "system"
+        if self._is_image_request(clean_command):
+            # Long-running like automation, and a follow-up question must not supersede it
+            return "automation"
+        is_image = any(keyword in clean_command for keyword in IMAGE_KEYWORDS)
+        if not is_image and any(keyword in clean_command for keyword in AUTOMATION_KEYWORDS):
+            return "automation"
+        return "query"
+    
+    def _is_image_request(self, user_input):
+        text = user_input.lower()
+        return any(keyword in text for keyword in ["generate", "create", "make"]) and any(keyword in text for keyword in IMAGE_KEYWORDS)
+    
+    async def _handle_request(self, request):
+        """Scheduler handler: control commands, then the decision model, then the chosen capability"""
+        user_input = request.text
+        try:
+            if await self.scheduler.stage(request, "control", self._handle_control, request):
+                return
+            
+            self._start_speculation(request)
+            
+            # Use the decision-making system
+            decision = await self.scheduler.stage(request, "decision", self.FirstLayerDMM, user_input)
+            print(f"[BackendManager] Decision: {decision}")
+            
+            # Process based on decision
+            if self._is_image_request(user_input):
+                stage = "images"
+            else:
+                stage = "automation" if request.lane == "automation" else "query"
+            response = await self.scheduler.stage(request, stage, self._execute_decision, user_input, decision, request)
+            
+            if response and self.is_running and not request.cancelled:
+                self.chat_response.emit(response)
+                self.status_update.emit("Available...")
                 if hasattr(self, 'current_state'):
                     self.current_state = 'idle'
+        
+        except asyncio.CancelledError:
+            print(f"[BackendManager] Request cancelled: {user_input}")
+            raise
+        except asyncio.TimeoutError:
+            self.error_occurred.emit(f"Request timed out: {user_input}")
+            self.status_update.emit("Available...")
+            if hasattr(self, 'current_state'):
+                self.current_state = 'idle'
+            raise
+        except Exception as e:
+            print(f"[BackendManager] Error processing input: {e}")
+            self.error_occurred.emit(f"Processing error: {e}")
+            self.status_update.emit("Error occurred")
+            if hasattr(self, 'current_state'):
+                self.current_state = 'idle'
+        finally:
+            self._discard_speculation(request)
+            # Sent on every exit path so the GUI never keeps an abandoned bubble as its live stream
+            self.stream_finished.emit()
+    
+    def _start_speculation(self, request):
+        """Run the web search (and warm Groq) while the decision model is still thinking"""
+        if not self.SPECULATIVE_SEARCH or request.lane != "query":
+            return
+        if not any(hint in request.text.lower() for hint in REALTIME_HINTS):
+            return
+        
+        def speculative_search():
+            # Loading the module here keeps a first-time import off the scheduler's loop
+            started = time.perf_counter()
+            search = self.modules.get("search")
+            self.speculation_pool.submit(search.warm_connection)
+            return search.GoogleSearch(request.text), (time.perf_counter() - started) * 1000
+        
+        request.speculation = self.speculation_pool.submit(speculative_search)
+        self.speculation_stats["started"] += 1
+        print(f"[BackendManager] Speculative search started: {request.text}")
+    
+    def _take_speculation(self, request):
+        """Search results of the speculative search, or None to search now; records the time it saved"""
+        future, request.speculation = request.speculation, None
+        if future is None:
+            return None
+        waited = time.perf_counter()
+        try:
+            results, search_ms = future.result(timeout=RequestScheduler.TIMEOUTS["query"])
+        except Exception as e:
+            print(f"[BackendManager] Speculative search failed, searching again: {e}")
+            self.speculation_stats["wasted"] += 1
+            return None
+        saved_ms = max(search_ms - (time.perf_counter() - waited) * 1000, 0.0)
+        self.speculation_stats["useful"] += 1
+        self.speculation_stats["saved_ms"] += saved_ms
+        print(f"[BackendManager] Speculative search used, saved {saved_ms:.0f}ms")
+        return results
+    
+    def _discard_speculation(self, request):
+        """The decision went elsewhere: drop the speculative search (its results stay in the search cache)"""
+        future, request.speculation = request.speculation, None
+        if future is not None:
+            future.cancel()
+            self.speculation_stats["wasted"] += 1
+            print("[BackendManager] Speculative search discarded")
     
-    def _execute_decision(self, user_input, decision):
+    def _handle_control(self, request):
+        """Home, exit, sleep/wake and interruption commands; returns True when the request needs nothing more"""
+        user_input = request.text
+        print(f"[BackendManager] Processing {request.input_type} input: {user_input}")
+        self.status_update.emit("Processing...")
+        
+        # Update current state for volume simulation
+        if hasattr(self, 'current_state'):
+            self.current_state = 'processing'
+        
+        # Home command
+        if user_input.lower().strip() in ["go home", "home"]:
+            print("[BackendManager] Home command detected")
+            self.go_home_requested.emit()
+            return True
+        
+        # Check for exit commands FIRST (before anything else)
+        if user_input.lower().strip() in ['bye', 'goodbye', 'exit', 'quit', 'close']:
+            print("[BackendManager] Exit command detected")
+            self.chat_response.emit("Goodbye! Closing the application...")
+            self.status_update.emit("Closing...")
+            # Stop all operations
+            self.is_running = False
+            self.stop_tts()
+            # Emit exit signal to close application
+            self.exitRequested.emit()
+            return True
+        
+        # Check for sleep/wake commands
+        command = user_input.lower().strip()
+        # Remove punctuation and common words for more flexible matching
+        clean_command = command.rstrip('.,!?').strip()
+        
+        # Check if the command contains sleep keywords (including common misheard variations)
+        is_sleep_command = any(keyword in clean_command for keyword in SLEEP_KEYWORDS)
+        
+        if is_sleep_command:
+            if not self.is_sleeping:
+                print("[BackendManager] Sleep command detected")
+                self.is_sleeping = True
+                self.chat_response.emit(SLEEP_MESSAGE)
+                self.status_update.emit("Sleeping...")
+                self._speak_response(SLEEP_MESSAGE)
+                if hasattr(self, 'current_state'):
+                    self.current_state = 'sleeping'
+            else:
+                print("[BackendManager] Already sleeping")
+            return True
+        
+        # Check if the command contains wake keywords (including common misheard variations)
+        is_wake_command = any(keyword in clean_command for keyword in WAKE_KEYWORDS)
+        
+        if is_wake_command:
+            if self.is_sleeping:
+                self._wake_up()
+            else:
+                print("[BackendManager] Already awake")
+            return True
+        
+        # If sleeping, don't process any other commands except wake up
+        if self.is_sleeping:
+            print(f"[BackendManager] Ignoring command while sleeping: {user_input}")
+            return True
+        
+        # Check for interruption keywords
+        if self.check_for_interruption(user_input):
+            print("[BackendManager] Interruption detected")
+            self.stop_tts()
+            if request.lane != "query":
+                self.scheduler.cancel("query", "interrupted")
+            self.status_update.emit("Stopped by user")
+            if hasattr(self, 'current_state'):
+                self.current_state = 'idle'
+            # Don't return here, continue processing the command if it's not just an interruption
+            # Only return if it's just an interruption command
+            if user_input.lower().strip() in ['stop', 'jarvis', 'assistant', 'halt', 'pause']:
+                return True
+        return False
+    
+    def _execute_decision(self, user_input, decision, request=None):
         """Execute the decision from the decision-making system"""
         decision_str = str(decision).lower()
         
@@ -278,13 +628,12 @@ class BackendManager(QObject):
             if any(keyword in user_input.lower() for keyword in ["close", "exit", "quit", "stop"]):
                 print("[BackendManager] Processing as close command")
                 self.status_update.emit("Closing application...")
-                import asyncio
                 try:
                     # Extract the app name to close
                     app_to_close = self._extract_app_to_close(user_input)
                     print(f"[BackendManager] Closing: {app_to_close}")
                     
-                    result = asyncio.run(self.Automation([f"close {app_to_close}"]))
+                    result = backend_loop.run(self.Automation([f"close {app_to_close}"]))
                     if result:
                         response = f"Closed {app_to_close} successfully"
                     else:
@@ -297,30 +646,21 @@ class BackendManager(QObject):
                     return error_msg
             
             # Check for image generation first
-            if any(keyword in user_input.lower() for keyword in ["generate", "create", "make"]) and any(keyword in user_input.lower() for keyword in ["image", "picture", "photo"]):
+            if self._is_image_request(user_input):
                 print("[BackendManager] Processing as image generation")
                 self.status_update.emit("Generating image...")
-                try:
-                    self.GenerateImages(user_input)
-                    response = f"Image generated for: {user_input}"
-                    self._speak_response(response)
-                    return response
-                except Exception as e:
-                    error_msg = f"Image generation failed: {e}"
-                    print(f"[BackendManager] {error_msg}")
-                    return error_msg
+                return self._generate_image(user_input)
             
             # Check for automation commands
             elif any(keyword in user_input.lower() for keyword in ["open", "play", "search", "mute", "unmute", "volume"]):
                 print("[BackendManager] Processing as automation task")
                 self.status_update.emit("Automating...")
-                import asyncio
                 try:
                     # Format the command properly for automation
                     formatted_command = self._format_automation_command(user_input)
                     print(f"[BackendManager] Formatted automation command: {formatted_command}")
                     
-                    result = asyncio.run(self.Automation([formatted_command]))
+                    result = backend_loop.run(self.Automation([formatted_command]))
                     if not result:
                         self.error_occurred.emit(f"Automation failed for: {user_input}")
                     response = f"Automation task completed: {user_input}"
@@ -334,27 +674,23 @@ class BackendManager(QObject):
             
             elif "general" in decision_str:
                 print("[BackendManager] Processing as general conversation")
-                response = self.ChatBot(user_input)
-                self._speak_response(response)
-                return response
+                return self._stream_response(self.ChatBotStream(user_input), request)
                 
-            elif "search" in decision_str or "google" in decision_str:
+            elif "realtime" in decision_str or "search" in decision_str or "google" in decision_str:
                 print("[BackendManager] Processing as search query")
                 self.status_update.emit("Searching...")
-                response = self.RealtimeSearchEngine(user_input)
-                self._speak_response(response)
-                return response
+                search_results = self._take_speculation(request) if request is not None else None
+                return self._stream_response(self.RealtimeSearchEngineStream(user_input, search_results=search_results), request)
                 
             elif "automation" in decision_str:
                 print("[BackendManager] Processing as automation task")
                 self.status_update.emit("Automating...")
-                import asyncio
                 try:
                     # Format the command properly for automation
                     formatted_command = self._format_automation_command(user_input)
                     print(f"[BackendManager] Formatted automation command: {formatted_command}")
                     
-                    result = asyncio.run(self.Automation([formatted_command]))
+                    result = backend_loop.run(self.Automation([formatted_command]))
                     if not result:
                         self.error_occurred.emit(f"Automation failed for: {user_input}")
                     response = f"Automation task completed: {user_input}"
@@ -369,21 +705,11 @@ class BackendManager(QObject):
             elif "image" in decision_str or "generate" in decision_str:
                 print("[BackendManager] Processing as image generation")
                 self.status_update.emit("Generating image...")
-                try:
-                    self.GenerateImages(user_input)
-                    response = f"Image generated for: {user_input}"
-                    self._speak_response(response)
-                    return response
-                except Exception as e:
-                    error_msg = f"Image generation failed: {e}"
-                    print(f"[BackendManager] {error_msg}")
-                    return error_msg
+                return self._generate_image(user_input)
                     
             else:
                 print("[BackendManager] Processing as default chatbot")
-                response = self.ChatBot(user_input)
-                self._speak_response(response)
-                return response
+                return self._stream_response(self.ChatBotStream(user_input), request)
                 
         except Exception as e:
             print(f"[BackendManager] Error in decision execution: {e}")
@@ -449,6 +775,60 @@ class BackendManager(QObject):
         # Default: return as is
         return user_input
     
+    def _generate_image(self, user_input):
+        """Generate images and tell the user whether any arrived (GenerateImages returns False otherwise)"""
+        try:
+            generated = self.GenerateImages(user_input)
+        except Exception as e:
+            error_msg = f"Image generation failed: {e}"
+            print(f"[BackendManager] {error_msg}")
+            return error_msg
+        if generated:
+            response = f"Image generated for: {user_input}"
+        else:
+            response = f"Sorry, I couldn't generate an image for: {user_input}"
+        self._speak_response(response)
+        return response
+    
+    def _stream_response(self, deltas, request=None):
+        """Forward streamed text to the GUI and speak it sentence by sentence as it arrives
+
+        Stops reading as soon as the scheduler cancels the request (superseded, interrupted or timed out)."""
+        self.stop_tts()
+        splitter = self.SentenceSplitter()
+        parts = []
+        started = time.time()
+        spoken = []
+        
+        def speak(sentence):
+            # The request may have been cancelled (and its speech stopped) since the last check
+            if request is not None and request.cancelled:
+                return
+            if not spoken:
+                print(f"[BackendManager] First sentence ready after {time.time() - started:.2f}s")
+                if hasattr(self, 'current_state'):
+                    self.current_state = 'speaking'
+                self.status_update.emit("Speaking...")
+            spoken.append(sentence)
+            self.QueueSpeech(sentence)
+        
+        for delta in deltas:
+            if not self.is_running or (request is not None and request.cancelled):
+                break
+            parts.append(delta)
+            self.chat_delta.emit(delta)
+            for sentence in splitter.feed(delta):
+                speak(sentence)
+        
+        if request is not None and request.cancelled:
+            print(f"[BackendManager] Stream abandoned after {time.time() - started:.2f}s")
+            return None
+        for sentence in splitter.flush():
+            speak(sentence)
+        
+        print(f"[BackendManager] Response streamed in {time.time() - started:.2f}s")
+        return self.AnswerModifier("".join(parts))
+    
     def _speak_response(self, text):
         """Speak the response using TTS"""
         # Stop any current TTS
@@ -494,12 +874,24 @@ class BackendManager(QObject):
                         self.status_update.emit("Sleeping...")
                         if hasattr(self, 'current_state'):
                             self.current_state = 'sleeping'
+                        if self.keyword_spotter and self.keyword_spotter.has_templates(WAKE_SPOTTER_KEYWORDS):
+                            # The keyword spotter wakes us. Fall back to the recognizer when it heard speech it could
+                            # not match (templates are speaker-dependent) and every SLEEP_RECHECK_SECONDS regardless
+                            self.keyword_spotter.speech_missed.clear()
+                            deadline = time.time() + SLEEP_RECHECK_SECONDS
+                            while self.is_sleeping and self.is_running and time.time() < deadline:
+                                if self.keyword_spotter.speech_missed.wait(0.1):
+                                    print("[BackendManager] Unmatched speech while asleep, checking with the recognizer")
+                                    break
+                            if not self.is_sleeping or not self.is_running:
+                                continue
                     else:
                         self.status_update.emit("Listening...")
                         if hasattr(self, 'current_state'):
                             self.current_state = 'listening'
                     
-                    voice_input = self.SpeechRecognition()
+                    voice_input = self.SpeechRecognition(
+                        on_partial=lambda text: self.status_update.emit(f"Listening... {text}"))
                     
                     if voice_input and self.is_running:
                         print(f"[BackendManager] Voice input received: {voice_input}")
@@ -512,25 +904,12 @@ class BackendManager(QObject):
                         print(f"[BackendManager] Checking wake command: '{clean_command}'")
                         
                         # Check if the command contains wake keywords (including common misheard variations)
-                        wake_keywords = [
-                            'wake up jarvis', 'jarvis wake up', 'wake up', 'wake',
-                            'wake jarvis', 'jarvis wake',           # Shorter version
-                            'wake up please', 'wake please',        # With please
-                            'get up jarvis', 'jarvis get up', 'get up',  # Alternative wake commands
-                            'rise jarvis', 'jarvis rise', 'rise'    # Another alternative
-                        ]
-                        is_wake_command = any(keyword in clean_command for keyword in wake_keywords)
+                        is_wake_command = any(keyword in clean_command for keyword in WAKE_KEYWORDS)
                         
                         if is_wake_command:
                             print(f"[BackendManager] Wake command match found!")
                             if self.is_sleeping:
-                                print("[BackendManager] Wake command detected while sleeping")
-                                self.is_sleeping = False
-                                self.chat_response.emit("Hello! I'm awake and ready to help you.")
-                                self.status_update.emit("Awake and ready...")
-                                self._speak_response("Hello! I'm awake and ready to help you.")
-                                if hasattr(self, 'current_state'):
-                                    self.current_state = 'idle'
+                                self._wake_up()
                             else:
                                 print("[BackendManager] Already awake")
                             continue  # Skip further processing
@@ -562,6 +941,11 @@ class BackendManager(QObject):
         print("[BackendManager] Stopping backend manager...")
         self.is_running = False
         self.stop_tts()
+        try:
+            if self.modules.is_ready("tts"):
+                self.modules.get("tts").shutdown_tts()
+        except Exception as e:
+            print(f"[BackendManager] Error releasing audio device: {e}")
         
         # Stop volume detection
         if hasattr(self, 'volume_timer'):
@@ -571,6 +955,16 @@ class BackendManager(QObject):
             stop_volume_detection()
         except Exception as e:
             print(f"[BackendManager] Error stopping volume detection: {e}")
+        if self.keyword_spotter:
+            self.keyword_spotter.stop()
+        if self.barge_in:
+            self.barge_in.stop()
+        try:
+            from Backend.AudioCapture import capture_bus
+            if capture_bus.is_running():
+                capture_bus.stop()
+        except Exception as e:
+            print(f"[BackendManager] Error closing microphone: {e}")
         
         if self.current_tts_thread:
             self.current_tts_thread.join(timeout=1)
@@ -578,6 +972,25 @@ class BackendManager(QObject):
         if self.stt_thread:
             self.stt_thread.join(timeout=1)
         
+        self.scheduler.stop()
+        for lane, stats in self.scheduler.stats().items():
+            print(f"[BackendManager] {lane} requests: {stats}")
+        backend_loop.stop()
+        
+        if self.modules.is_ready("search"):
+            print(f"[BackendManager] Search cache: {self.modules.get('search').search_stats}")
+        stats = self.speculation_stats
+        if stats["started"]:
+            print(f"[BackendManager] Speculative searches: {stats['useful']}/{stats['started']} useful, "
+                  f"{stats['saved_ms'] / max(stats['useful'], 1):.0f}ms saved per useful query")
+        self.speculation_pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            from Backend.Resilience import retry_metrics
+            for provider, metrics in retry_metrics().items():
+                print(f"[BackendManager] {provider}: {metrics}")
+        except Exception as e:
+            print(f"[BackendManager] Error reading retry metrics: {e}")
+        
         print("[BackendManager] Backend manager stopped")
 
     def _extract_app_to_close(self, user_input):